@@ -1,24 +1,47 @@
 import pygame
 import math
 import settings
-from settings import TILE_SIZE, WALK_SPEED, SPRINT_SPEED, SPRINT_COOLDOWN, POINTS, REQUIRED_POINTS, screen
-from game.collision import is_blocked
+from settings import TILE_SIZE, WALK_SPEED, SPRINT_SPEED, SPRINT_COOLDOWN
+from game.ecs import World
+from game.tiles import TILE_TELEPORT_NEXT, TILE_TELEPORT_PREV
 from utils.sound_manager import play_sound, GameSounds
 import random
 
+PLAYER_COMPONENTS = ("pos", "prev_pos", "move", "speed", "awake", "jumping", "jump_started", "jump_timer",
+                     "jump_height", "pose", "frame", "anim_time")
+PLAYER_TAGS = ("stomper",)
+
+# Poses of the player's frames (see utils.animation.ANIMATIONS)
+POSE_DEFAULT, POSE_UP, POSE_DOWN, POSE_LEFT, POSE_RIGHT = range(5)
+
+
 class Player:
-    def __init__(self, pos, textures, game_map):
-        self.pos = pos
-        self.textures = textures
+    """The player: input, sprinting and teleporting, over its entity in the world's "player" archetype
+
+    Moving, jumping, animating, stomping NPCs, jump sounds and drawing are
+    done by the systems in game.systems, from the components control() sets.
+    """
+
+    __slots__ = ("world", "archetype", "entity", "textures", "game_map", "sprinting", "sprint_energy",
+                 "sprint_cooldown", "energy_regen_rate", "energy_use_rate", "key_press", "footstep_timer",
+                 "teleport_countdown", "teleporting", "teleport_direction")
+
+    body_half_size = 0.3  # Collision box around pos, in tiles
+    max_jump_height = 30
+
+    def __init__(self, pos, textures, game_map, world=None):
+        self.world = world if world is not None else World()
+        self.archetype = self.world.register("player", PLAYER_COMPONENTS, PLAYER_TAGS, {
+            "layer": 0,  # With the NPCs, overlapping by how far down the screen they stand
+            "body": (-self.body_half_size, -self.body_half_size, 2 * self.body_half_size),
+            "max_jump_height": self.max_jump_height,
+            "jump_sound": (GameSounds.PLAYER_JUMP, 1.0),
+        })
+        self.entity = self.world.spawn("player", pos=(pos.x, pos.y), prev_pos=(pos.x, pos.y), speed=WALK_SPEED,
+                                       awake=True)
+        self.set_textures(textures)
         self.game_map = game_map
-        self.image = textures['player_default']
-        
-        # Jump properties
-        self.jump_height = 0
-        self.jumping = False
-        self.jump_time = 0
-        self.max_jump_height = 30
-        
+
         # Sprint properties
         self.sprinting = False
         self.sprint_energy = 100.0
@@ -26,27 +49,81 @@ class Player:
         self.energy_regen_rate = 15.0
         self.energy_use_rate = 20.0
         self.key_press = False
-        
-        # Collision rect
-        self.rect = pygame.Rect(self.pos.x * TILE_SIZE, self.pos.y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+        self.footstep_timer = 0
 
         # teleport
         self.teleport_countdown = 0
         self.teleporting = False
         self.teleport_direction = None
 
+    def set_textures(self, textures):
+        self.textures = textures
+        self.archetype.traits["frames"] = textures['frames']['player']
 
-        
-    def update(self, dt, keys, map_data):
-        # Reset player position if R is pressed
+    def column(self, component):
+        """The player's row of a component column"""
+        return self.archetype.columns[component][self.world.location(self.entity)[1]]
+
+    def set(self, component, value):
+        self.archetype.columns[component][self.world.location(self.entity)[1]] = value
+
+    @property
+    def pos(self):
+        x, y = self.column("pos")
+        return pygame.Vector2(float(x), float(y))
+
+    @pos.setter
+    def pos(self, value):
+        self.set("pos", (value[0], value[1]))
+
+    @property
+    def prev_pos(self):
+        """Position at the previous tick, for interpolation"""
+        x, y = self.column("prev_pos")
+        return pygame.Vector2(float(x), float(y))
+
+    @prev_pos.setter
+    def prev_pos(self, value):
+        self.set("prev_pos", (value[0], value[1]))
+
+    @property
+    def jumping(self):
+        return bool(self.column("jumping"))
+
+    @property
+    def jump_height(self):
+        return int(self.column("jump_height"))
+
+    @property
+    def jump_time(self):
+        return float(self.column("jump_timer"))
+
+    @property
+    def image(self):
+        """The current animation frame"""
+        return self.archetype.traits["frames"].surfaces[self.column("frame")]
+
+    @property
+    def rect(self):
+        """Collision rect"""
+        x, y = self.column("pos")
+        return pygame.Rect(int(x * TILE_SIZE), int(y * TILE_SIZE), TILE_SIZE, TILE_SIZE)
+
+    def control(self, dt, keys):
+        """Turn this tick's keys into the player's move, speed, jump and pose components"""
+        # Reset player position if R is pressed, and sit the rest of the tick out
         if keys[pygame.K_r]:
-            self.pos = self.game_map.find_spawn_location()
-            self.jumping = False
-            self.jump_height = 0
+            self.pos = self.game_map.features.spawn
+            self.set("jumping", False)
+            self.set("jump_height", 0)
+            self.set("jump_started", False)
+            self.set("move", 0)
+            self.set("awake", False)
             return
+        self.set("awake", True)
     
-        move_dir = pygame.Vector2(0, 0)
-        new_image = self.textures['player_default']
+        move_x = move_y = 0
+        pose = POSE_DEFAULT
         
         # Handle sprint energy and cooldown
         if self.sprint_cooldown > 0:
@@ -75,72 +152,53 @@ class Player:
                     self.sprint_cooldown = SPRINT_COOLDOWN
         else:
             self.sprinting = False
+        self.set("speed", movement_speed)
             
         # Get key input
         self.key_press = False
         if keys[pygame.K_w] or keys[pygame.K_UP]:
-            move_dir.y -= 1
-            new_image = self.textures['player_up']
+            move_y -= 1
+            pose = POSE_UP
             self.key_press = True
         if keys[pygame.K_s] or keys[pygame.K_DOWN]:
-            move_dir.y += 1
-            new_image = self.textures['player_down']
+            move_y += 1
+            pose = POSE_DOWN
             self.key_press = True
         if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-            move_dir.x -= 1
-            new_image = self.textures['player_left']
+            move_x -= 1
+            pose = POSE_LEFT
             self.key_press = True
         if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-            move_dir.x += 1
-            new_image = self.textures['player_right']
+            move_x += 1
+            pose = POSE_RIGHT
             self.key_press = True
             
-        # Handle jumping
-        if keys[pygame.K_SPACE] and not self.jumping:
-            self.jumping = True
-            self.jump_time = 0
+        # Handle jumping; the jump and animation systems do the rest
+        started = keys[pygame.K_SPACE] and not self.jumping
+        self.set("jump_started", started)
+        if started:
+            self.set("jumping", True)
+            self.set("jump_timer", 0)
             self.key_press = True
-            play_sound(GameSounds.PLAYER_JUMP, settings.SFX_VOLUME)
-            
-        if self.jumping:
-            self.jump_time += dt
-            self.jump_height = int(self.max_jump_height * math.sin(self.jump_time * math.pi))
-            new_image = self.textures['player_jump']
-            
-            if self.jump_time >= 1.0:
-                self.jumping = False
-                self.jump_height = 0
         
-        # Movement with collision detection
-        if move_dir.length() > 0:
-            move_dir = move_dir.normalize()
-            
-            # Try to move in x and y directions separately to allow sliding along obstacles
-            target_x = self.pos + pygame.Vector2(move_dir.x * dt * movement_speed, 0)
-            if not is_blocked(map_data, target_x.x, target_x.y):
-                self.pos.x = target_x.x
-                
-            target_y = self.pos + pygame.Vector2(0, move_dir.y * dt * movement_speed)
-            if not is_blocked(map_data, target_y.x, target_y.y):
-                self.pos.y = target_y.y
-                
-            self.image = new_image
+        # Movement direction, swept against obstacles by the movement system
+        if move_x or move_y:
+            length = math.hypot(move_x, move_y)
+            self.set("move", (move_x / length, move_y / length))
+            self.set("pose", pose)
 
             # Add footstep sounds with timing based on speed
-            self.footstep_timer = getattr(self, 'footstep_timer', 0) + dt
+            self.footstep_timer += dt
             step_interval = 0.4 if not self.sprinting else 0.2
             if self.footstep_timer >= step_interval:
                 play_sound(GameSounds.PLAYER_WALK, settings.SFX_VOLUME * 0.4)
                 self.footstep_timer = 0
-        
-        # Update collision rect
-        self.rect.x = self.pos.x * TILE_SIZE
-        self.rect.y = self.pos.y * TILE_SIZE
+        else:
+            self.set("move", 0)
 
-        # Add this to your Player.update method, just before the return statement:
-        # Handle teleport countdown
-       # Handle teleport countdown
-        if self.teleporting:
+    def advance_teleport(self, dt):
+        """Count down a teleport in progress, returning its direction once it completes"""
+        if self.teleporting and self.column("awake"):
             # print(f"Teleporting countdown: {self.teleport_countdown:.2f}s to {self.teleport_direction}")
             self.teleport_countdown -= dt
             if self.teleport_countdown <= 0:
@@ -153,11 +211,6 @@ class Player:
         
         return None  # Make sure to return None if not teleporting
             
-    def draw(self, screen):
-        screen_x = screen.get_width() / 2 - self.image.get_width() / 2
-        screen_y = screen.get_height() / 2 - self.image.get_height() / 2 - self.jump_height
-        screen.blit(self.image, (screen_x, screen_y))
-    
     def get_current_block(self):
         """Get information about the block the player is currently on"""
         # Get the block coordinates the player is currently on
@@ -165,8 +218,9 @@ class Player:
         block_y = int(self.pos.y)
         
         # Check if the coordinates are within the map boundaries
-        if 0 <= block_y < len(self.game_map.data) and 0 <= block_x < len(self.game_map.data[0]):
-            tile_id = self.game_map.data[block_y][block_x]
+        map_height, map_width = self.game_map.data.shape
+        if 0 <= block_y < map_height and 0 <= block_x < map_width:
+            tile_id = self.game_map.data[block_y, block_x]
             tile_name = self.game_map.get_tile_name(tile_id)
             
             return {
@@ -179,8 +233,6 @@ class Player:
     # In player.py, update the check_teleportation method
     def check_teleportation(self, map_data):
         """Check if player is on a teleport tile and has enough points"""
-        from settings import POINTS
-        
         # If already teleporting, don't start another countdown
         if self.teleporting:
             return
@@ -188,20 +240,17 @@ class Player:
         block_x = int(self.pos.x)
         block_y = int(self.pos.y)
         
-        # Calculate required points based on current map
-        map_number = self.game_map.map_number
-        required_points = (map_number + 1) * 5  # 5 points for map 0, 10 for map 1, etc.
-        
         # Check if coordinates are within map boundaries
-        if 0 <= block_y < len(map_data) and 0 <= block_x < len(map_data[0]):
-            tile_id = map_data[block_y][block_x]
+        map_height, map_width = map_data.shape
+        if 0 <= block_y < map_height and 0 <= block_x < map_width:
+            category = self.game_map.category[block_y, block_x]
             
-            if tile_id == 11 and POINTS >= required_points:  # Next map teleport
+            if category == TILE_TELEPORT_NEXT and self.world.points >= self.game_map.required_points:  # Next map teleport
                 self.teleporting = True
                 self.teleport_countdown = 0.9  # Reduced from 1.0 to 0.5 seconds
                 self.teleport_direction = "next"
                 play_sound(GameSounds.PLAYER_TELEPORT, settings.SFX_VOLUME)
-            elif tile_id == 12:  # Previous map teleport
+            elif category == TILE_TELEPORT_PREV:  # Previous map teleport
                 self.teleporting = True
                 self.teleport_countdown = 0.9  # Reduced from 1.0 to 0.5 seconds
                 self.teleport_direction = "previous"
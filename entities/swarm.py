@@ -0,0 +1,181 @@
+import pygame
+import numpy as np
+from game.ecs import World
+from game.spatial import SpatialHash
+from game.systems import scratch
+from utils.sound_manager import GameSounds
+
+NPC_BODY_SIZE = 0.25  # Collision box from pos, in tiles (the 16px sprite)
+
+NPC_COMPONENTS = ("pos", "prev_pos", "move", "speed", "awake", "facing_right", "jumping", "jump_started",
+                  "jump_timer", "jump_height", "cell", "frame", "anim_time")
+NPC_TAGS = ("chaser", "stompable")
+
+
+class NPCView:
+    """Handle onto one NPC of a swarm, usable wherever an NPC is expected"""
+
+    __slots__ = ("swarm", "entity")
+
+    def __init__(self, swarm, entity):
+        self.swarm = swarm
+        self.entity = entity
+
+    @property
+    def row(self):
+        """The NPC's row in the swarm's arrays, which changes as other NPCs are removed"""
+        return self.swarm.world.location(self.entity)[1]
+
+    @property
+    def pos(self):
+        x, y = self.swarm.pos[self.row]
+        return pygame.Vector2(float(x), float(y))
+
+    @pos.setter
+    def pos(self, value):
+        self.swarm.pos[self.row] = (value[0], value[1])
+
+    @property
+    def jumping(self):
+        return bool(self.swarm.jumping[self.row])
+
+    @property
+    def jump_height(self):
+        return int(self.swarm.jump_height[self.row])
+
+    @property
+    def facing_right(self):
+        return bool(self.swarm.facing_right[self.row])
+
+
+class NPCSwarm:
+    """All NPCs of a map: a facade over the "npc" archetype of a world
+
+    The systems in game.systems do the simulating and drawing; the swarm
+    spawns and removes NPCs and keeps their spatial index in sync.
+    """
+
+    max_jump_height = 20
+    jump_chance = 0.01  # Per NPC per update
+    speed = 1.5  # Tiles per second, slower than player
+    body_size = NPC_BODY_SIZE
+    update_range = 20  # Only NPCs this close to the player (in tiles) are updated
+    sound_range = 10
+
+    def __init__(self, textures, capacity=64, seed=None, world=None):
+        self.world = world if world is not None else World(seed)
+        self.archetype = self.world.register("npc", NPC_COMPONENTS, NPC_TAGS, {
+            "layer": 0,
+            "body": (0.0, 0.0, self.body_size),
+            "max_jump_height": self.max_jump_height,
+            "jump_chance": self.jump_chance,
+            "update_range": self.update_range,
+            "jump_sound": (GameSounds.NPC_JUMP, 0.3),
+            "sound_range": self.sound_range,
+            "points": 1,
+            "stomp_sounds": ((GameSounds.NPC_HIT, 1.0), (GameSounds.POINT_COLLECT, 0.7)),
+        })
+        if capacity > self.archetype.capacity:
+            self.archetype.allocate(capacity)
+        self.set_textures(textures)
+        self.index = SpatialHash()
+        self.views = {}  # Entity -> NPCView
+
+    def set_textures(self, textures):
+        self.archetype.traits["frames"] = textures['frames']['npc']
+
+    # The swarm's arrays, over capacity rows of which the first count are live
+    @property
+    def pos(self):
+        return self.archetype.columns["pos"]
+
+    @property
+    def prev_pos(self):
+        return self.archetype.columns["prev_pos"]
+
+    @property
+    def jumping(self):
+        return self.archetype.columns["jumping"]
+
+    @property
+    def jump_timer(self):
+        return self.archetype.columns["jump_timer"]
+
+    @property
+    def jump_height(self):
+        return self.archetype.columns["jump_height"]
+
+    @property
+    def facing_right(self):
+        return self.archetype.columns["facing_right"]
+
+    @property
+    def cells(self):
+        return self.archetype.columns["cell"]
+
+    @property
+    def count(self):
+        return self.archetype.count
+
+    @property
+    def rng(self):
+        return self.world.rng
+
+    def __len__(self):
+        return self.archetype.count
+
+    def __iter__(self):
+        views = self.views
+        return iter([views[entity] for entity in self.archetype.entities[:self.count].tolist()])
+
+    def add(self, x, y):
+        """Add an NPC at a position in tiles and return its view"""
+        entity = self.world.spawn("npc", pos=(x, y), prev_pos=(x, y), speed=self.speed, facing_right=True,
+                                  cell=self.index.cell_of(x, y))
+        view = NPCView(self, entity)
+        self.views[entity] = view
+        self.index.insert(view)
+        return view
+
+    def spawn(self, count, safe_cells):
+        """Add NPCs at random distinct safe cells, in time independent of the map size"""
+        for x, y in safe_cells.sample(count, self.rng):
+            self.add(x, y)
+
+    def remove(self, view):
+        """Remove an NPC in O(1)"""
+        self.index.remove(view)
+        self.world.despawn(view.entity)
+        del self.views[view.entity]
+
+    def forget(self, entities):
+        """Drop the views of NPCs that systems removed from the world"""
+        for entity in entities:
+            view = self.views.pop(entity, None)
+            if view is not None:
+                self.index.remove(view)
+
+    def clear(self):
+        self.world.despawn_all("npc")
+        self.views.clear()
+        self.index.clear()
+
+    def sync_index(self):
+        """Move the NPCs that crossed into a new cell in the spatial index"""
+        n = self.count
+        if not n:
+            return
+        pairs = scratch.get("cell_pairs", n, columns=2)
+        cells = scratch.get("cells", n, np.int64, columns=2)
+        changed = scratch.get("changed", n, bool, columns=2)
+        moved = scratch.get("moved", n, bool)
+        np.divide(self.archetype["pos"], self.index.cell_size, out=pairs)
+        np.floor(pairs, out=pairs)
+        np.copyto(cells, pairs, casting="unsafe")
+        np.not_equal(cells, self.archetype["cell"], out=changed)
+        changed.any(axis=1, out=moved)
+        if moved.any():
+            self.archetype["cell"][:] = cells
+            views = self.views
+            for entity in self.archetype.entities[:n][moved].tolist():
+                self.index.update(views[entity])
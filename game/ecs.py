@@ -0,0 +1,151 @@
+"""Archetype-based entity storage.
+
+Entities with the same components live together in an Archetype, each
+component a column of a contiguous numpy array with one row per entity, so
+systems can process a whole archetype with array operations instead of
+calling into one object per entity. Besides components, an archetype has
+tags (components without data, e.g. "chaser") and traits (values shared by
+all its entities, e.g. animation frames, sounds and body size).
+
+Entities are integer ids that stay valid while their rows move around as
+other entities are removed.
+"""
+import numpy as np
+
+# Component name -> (dtype, shape of one entity's value)
+COMPONENTS = {
+    "pos": (np.float64, (2,)),  # Position in tiles
+    "prev_pos": (np.float64, (2,)),  # Position at the previous tick, for interpolation
+    "move": (np.float64, (2,)),  # Unit direction to move in this tick, or zero
+    "speed": (np.float64, ()),  # Tiles per second
+    "awake": (bool, ()),  # Updated this tick; entities asleep don't move or jump
+    "facing_right": (bool, ()),
+    "jumping": (bool, ()),
+    "jump_started": (bool, ()),  # Took off this tick
+    "jump_timer": (np.float64, ()),  # Seconds into the jump
+    "jump_height": (np.int32, ()),  # Pixels above the ground
+    "cell": (np.int64, (2,)),  # Spatial hash cell
+    "pose": (np.int32, ()),  # Which pose of its frames trait to draw, for entities not picking it by facing
+    "frame": (np.int64, ()),  # Frame of its frames trait to draw
+    "anim_time": (np.float64, ()),  # Seconds spent walking, for the walk cycle
+}
+
+
+class Archetype:
+    """Entities sharing one set of components, stored as parallel columns"""
+
+    def __init__(self, name, components, tags=(), traits=None, capacity=64):
+        self.name = name
+        self.tags = frozenset(tags)
+        self.traits = dict(traits or {})
+        self.columns = {component: None for component in components}
+        self.entities = None  # Entity id of each row
+        self.count = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        """Grow the columns, keeping the live rows"""
+        def grow(array, dtype, shape):
+            new = np.zeros((capacity,) + shape, dtype=dtype)
+            if array is not None:
+                new[:self.count] = array[:self.count]
+            return new
+
+        self.capacity = capacity
+        for component in self.columns:
+            dtype, shape = COMPONENTS[component]
+            self.columns[component] = grow(self.columns[component], dtype, shape)
+        self.entities = grow(self.entities, np.int64, ())
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, component):
+        """Get a component's column over the live rows"""
+        return self.columns[component][:self.count]
+
+    def has(self, names):
+        return all(name in self.columns or name in self.tags for name in names)
+
+    def add(self, entity, values):
+        """Append a row, zeroed apart from the given component values, and return it"""
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+        row = self.count
+        for component, column in self.columns.items():
+            column[row] = values.get(component, 0)
+        self.entities[row] = entity
+        self.count += 1
+        return row
+
+    def remove(self, row):
+        """Remove a row in O(1) by moving the last row into it; returns the moved entity, if any"""
+        last = self.count - 1
+        moved = None
+        if row != last:
+            for column in self.columns.values():
+                column[row] = column[last]
+            self.entities[row] = self.entities[last]
+            moved = int(self.entities[row])
+        self.count = last
+        return moved
+
+    def clear(self):
+        self.count = 0
+
+
+class World:
+    """Every entity, grouped by archetype, plus the state the systems share"""
+
+    def __init__(self, seed=None, points=0):
+        self.archetypes = {}
+        self.rng = np.random.default_rng(seed)  # All randomness of the systems
+        self.points = points
+        self.sounds = []  # (sound, volume, distance) of one-off sounds raised this tick
+        self.locations = {}  # Entity id -> (archetype, row)
+        self.next_entity = 0
+        self.queries = {}
+
+    def register(self, name, components, tags=(), traits=None):
+        """Add an archetype, or return the existing one of that name"""
+        archetype = self.archetypes.get(name)
+        if archetype is None:
+            archetype = Archetype(name, components, tags, traits)
+            self.archetypes[name] = archetype
+            self.queries.clear()
+        return archetype
+
+    def query(self, *names):
+        """Get the archetypes that have all the given components and tags, in registration order"""
+        archetypes = self.queries.get(names)
+        if archetypes is None:
+            archetypes = tuple(archetype for archetype in self.archetypes.values() if archetype.has(names))
+            self.queries[names] = archetypes
+        return archetypes
+
+    def spawn(self, name, **values):
+        """Create an entity of an archetype and return its id"""
+        archetype = self.archetypes[name]
+        entity = self.next_entity
+        self.next_entity += 1
+        self.locations[entity] = (archetype, archetype.add(entity, values))
+        return entity
+
+    def despawn(self, entity):
+        archetype, row = self.locations.pop(entity)
+        moved = archetype.remove(row)
+        if moved is not None:
+            self.locations[moved] = (archetype, row)
+
+    def despawn_all(self, name):
+        archetype = self.archetypes[name]
+        for entity in archetype.entities[:archetype.count].tolist():
+            del self.locations[entity]
+        archetype.clear()
+
+    def __contains__(self, entity):
+        return entity in self.locations
+
+    def location(self, entity):
+        """Get the (archetype, row) holding an entity"""
+        return self.locations[entity]
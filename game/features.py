@@ -0,0 +1,64 @@
+import random
+import numpy as np
+from game.tiles import TILE_SPAWN, TILE_TELEPORT_NEXT, TILE_TELEPORT_PREV
+
+TELEPORT_DIRECTIONS = {TILE_TELEPORT_NEXT: "next", TILE_TELEPORT_PREV: "previous"}
+
+
+class SafeCells:
+    """Cells NPCs may spawn on, sampled without replacement in O(1) per cell
+
+    Sampling runs a Fisher-Yates shuffle one step at a time: the cells before
+    the cursor have been handed out this round, the rest are still available.
+    A round starts over once too few cells are left for a request.
+    """
+
+    def __init__(self, xs, ys):
+        self.xs = np.asarray(xs, dtype=np.int64)
+        self.ys = np.asarray(ys, dtype=np.int64)
+        self.order = list(range(len(self.xs)))
+        self.cursor = 0
+
+    def __len__(self):
+        return len(self.order)
+
+    def sample(self, count, rng=None):
+        """Get up to count distinct (x, y) cells, using a numpy Generator or the random module"""
+        order = self.order
+        size = len(order)
+        count = min(count, size)
+        if count > size - self.cursor:
+            self.cursor = 0
+        pick = rng.integers if rng is not None else random.randrange
+
+        cells = []
+        for _ in range(count):
+            cursor = self.cursor
+            other = int(pick(cursor, size))
+            order[cursor], order[other] = order[other], order[cursor]
+            cell = order[cursor]
+            cells.append((int(self.xs[cell]), int(self.ys[cell])))
+            self.cursor = cursor + 1
+        return cells
+
+
+def find_safe_cells(collidable, category):
+    """Find the cells NPCs may spawn on, as parallel x and y arrays"""
+    # Skip the border
+    safe = ~collidable[1:-1, 1:-1] & (category[1:-1, 1:-1] != TILE_SPAWN)
+    safe_y, safe_x = np.nonzero(safe)
+    return safe_x + 1, safe_y + 1
+
+
+class MapFeatures:
+    """Spawn point, teleporters and NPC-safe cells of a map, found once at load time"""
+
+    def __init__(self, spawn, teleporters, collidable, category):
+        self.spawn = spawn if spawn is not None else (1, 1)  # Fallback to 1,1 if no spawn point found
+
+        # "next" / "previous" -> [(x, y), ...]
+        self.teleporters = {direction: [] for direction in TELEPORT_DIRECTIONS.values()}
+        for x, y, kind in teleporters:
+            self.teleporters[TELEPORT_DIRECTIONS[kind]].append((x, y))
+
+        self.safe_cells = SafeCells(*find_safe_cells(collidable, category))
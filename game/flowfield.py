@@ -0,0 +1,228 @@
+from array import array
+from collections import deque
+import numpy as np
+import settings
+from utils.scratch import ScratchBuffers
+
+UNREACHED = -1
+PADDING = 2  # Unreached cells around a published field
+
+# Work arrays of direction lookups
+scratch = ScratchBuffers()
+
+# Neighbour offsets (dx, dy); diagonals come last
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class FlowField:
+    """Shared BFS distance map toward the player's tile over walkable tiles
+
+    NPCs read their move direction from it in O(1) instead of each running
+    their own pathfinding. The search and the stored field are limited to a
+    window of radius tiles around the target, so their cost does not grow
+    with the map. With a budget, a recompute is spread over several updates
+    and the previous field stays in use until the new one is done.
+    """
+
+    def __init__(self, collidable, budget=None, radius=None):
+        self.collidable = collidable
+        self.height, self.width = collidable.shape
+        self.budget = settings.FLOW_FIELD_BUDGET if budget is None else budget  # Cells per update, 0 = unlimited
+        self.radius = settings.FLOW_FIELD_RADIUS if radius is None else radius  # Tiles around the target, 0 = whole map
+
+        # Published field over the window at origin, None until the first computation completes
+        self.distance = None
+        self.padded = None  # The field with its border, which distance is a view of
+        self.origin = (0, 0)
+        self.target = None
+
+        # In-progress computation
+        self.pending_target = None
+        self.pending_origin = None
+        self.pending_distance = None
+        self.pending_shape = None
+        self.walkable = None
+        self.frontier = None
+
+    def update(self, tile_x, tile_y):
+        """Advance any recompute in progress, or start one when the target tile changes
+
+        A recompute is never restarted, so a target that keeps moving still
+        gets a field published every so often; once it is done, the next one
+        heads for wherever the target is then.
+        """
+        target = (tile_x, tile_y)
+        if self.frontier is None and target != self.target:
+            self.start(target)
+        if self.frontier is not None:
+            self.advance(self.budget)
+
+    def start(self, target):
+        tile_x, tile_y = target
+        self.pending_target = target
+        self.frontier = deque()
+
+        # Only search the window around the target that NPCs can make use of
+        if self.radius:
+            min_x, min_y = max(0, tile_x - self.radius), max(0, tile_y - self.radius)
+            max_x = min(self.width, tile_x + self.radius + 1)
+            max_y = min(self.height, tile_y + self.radius + 1)
+        else:
+            min_x, min_y, max_x, max_y = 0, 0, self.width, self.height
+        max_x, max_y = max(min_x, max_x), max(min_y, max_y)
+
+        self.pending_origin = (min_x, min_y)
+        self.pending_shape = (max_y - min_y, max_x - min_x)
+        self.walkable = (~self.collidable[min_y:max_y, min_x:max_x]).ravel().tolist()
+        self.pending_distance = array('i', [UNREACHED]) * len(self.walkable)
+
+        if min_x <= tile_x < max_x and min_y <= tile_y < max_y:
+            start = (tile_y - min_y) * (max_x - min_x) + (tile_x - min_x)
+            self.pending_distance[start] = 0
+            self.frontier.append(start)
+
+    def advance(self, budget=0):
+        """Expand the pending BFS by up to budget cells (all of them if 0)"""
+        distance = self.pending_distance
+        frontier = self.frontier
+        walkable = self.walkable
+        height, width = self.pending_shape
+        remaining = budget or len(distance)
+
+        while frontier and remaining:
+            cell = frontier.popleft()
+            remaining -= 1
+            next_distance = distance[cell] + 1
+            y, x = divmod(cell, width)
+
+            for neighbour in (cell - width if y > 0 else -1, cell + width if y < height - 1 else -1,
+                              cell - 1 if x > 0 else -1, cell + 1 if x < width - 1 else -1):
+                if neighbour >= 0 and distance[neighbour] == UNREACHED and walkable[neighbour]:
+                    distance[neighbour] = next_distance
+                    frontier.append(neighbour)
+
+        if not frontier:
+            self.publish()
+
+    def publish(self):
+        # Bordered by two unreached cells, so lookups around any clamped position stay in bounds
+        height, width = self.pending_shape
+        self.padded = np.full((height + 2 * PADDING, width + 2 * PADDING), UNREACHED, dtype=np.int32)
+        self.distance = self.padded[PADDING:PADDING + height, PADDING:PADDING + width]
+        self.distance[:] = np.frombuffer(self.pending_distance, dtype=np.int32).reshape(self.pending_shape)
+        self.origin = self.pending_origin
+        self.target = self.pending_target
+        self.pending_target = None
+        self.pending_origin = None
+        self.pending_distance = None
+        self.pending_shape = None
+        self.walkable = None
+        self.frontier = None
+
+    def directions(self, xs, ys, out=None):
+        """Get unit move directions for positions in tiles
+
+        Returns (dx, dy, valid); where valid is False the field has no route
+        (unreached tile, target tile, or no field yet) and callers should fall
+        back to steering straight at the target. Results go to the three
+        arrays of out when given, and the work arrays are reused, so
+        steady-state calls allocate nothing.
+        """
+        count = len(xs)
+        if out is None:
+            out = (np.empty(count), np.empty(count), np.empty(count, dtype=bool))
+        dx, dy, valid = out
+        if self.distance is None or not count:
+            dx.fill(0)
+            dy.fill(0)
+            valid.fill(False)
+            return dx, dy, valid
+
+        window_height, window_width = self.distance.shape
+        padded_width = window_width + 2 * PADDING
+        cells = self.padded.reshape(-1)
+        origin_x, origin_y = self.origin
+
+        tile_x = scratch.get("tile_x", count, np.int64)
+        tile_y = scratch.get("tile_y", count, np.int64)
+        np.copyto(tile_x, xs, casting="unsafe")
+        np.copyto(tile_y, ys, casting="unsafe")
+
+        # Padded index of each tile, clamped to the border when outside the window
+        index = scratch.get("index", count, np.int64)
+        column = scratch.get("column", count, np.int64)
+        np.subtract(tile_y, origin_y, out=index)
+        np.clip(index, -1, window_height, out=index)
+        index += PADDING
+        index *= padded_width
+        np.subtract(tile_x, origin_x, out=column)
+        np.clip(column, -1, window_width, out=column)
+        column += PADDING
+        index += column
+
+        neighbour = scratch.get("neighbour", count, np.int64)
+        here = scratch.get("here", count, np.int32)
+        np.take(cells, index, out=here, mode="clip")
+
+        best = scratch.get("best", count, np.int32)
+        best_x = scratch.get("best_x", count, np.int64)
+        best_y = scratch.get("best_y", count, np.int64)
+        better = scratch.get("better", count, bool)
+        check = scratch.get("check", count, bool)
+        np.copyto(best, here)
+        np.less_equal(here, 0, out=better)
+        np.copyto(best, UNREACHED, where=better)
+        best_x.fill(0)
+        best_y.fill(0)
+
+        # Distances of the straight neighbours, kept for the corner checks of the diagonals
+        straight = {}
+        for ox, oy in NEIGHBOURS:
+            candidate = scratch.get(("candidate", ox, oy), count, np.int32)
+            np.add(index, oy * padded_width + ox, out=neighbour)
+            np.take(cells, neighbour, out=candidate, mode="clip")
+            if ox and oy:
+                # No cutting corners past walls
+                np.equal(straight[ox, 0], UNREACHED, out=better)
+                np.equal(straight[0, oy], UNREACHED, out=check)
+                better |= check
+                np.copyto(candidate, UNREACHED, where=better)
+            else:
+                straight[ox, oy] = candidate
+            np.not_equal(candidate, UNREACHED, out=better)
+            np.not_equal(best, UNREACHED, out=check)
+            better &= check
+            np.less(candidate, best, out=check)
+            better &= check
+            np.copyto(best, candidate, where=better)
+            np.copyto(best_x, ox, where=better)
+            np.copyto(best_y, oy, where=better)
+
+        # Head for the centre of the chosen neighbour tile
+        np.not_equal(best_x, 0, out=valid)
+        np.not_equal(best_y, 0, out=check)
+        valid |= check
+        np.logical_not(valid, out=check)
+        tile_x += best_x
+        np.add(tile_x, 0.5, out=dx)
+        dx -= xs
+        np.copyto(dx, 0, where=check)
+        tile_y += best_y
+        np.add(tile_y, 0.5, out=dy)
+        dy -= ys
+        np.copyto(dy, 0, where=check)
+
+        length = scratch.get("length", count)
+        np.hypot(dx, dy, out=length)
+        np.greater(length, 0, out=check)
+        valid &= check
+        np.divide(dx, length, out=dx, where=valid)
+        np.divide(dy, length, out=dy, where=valid)
+        return dx, dy, valid
+
+    def direction_at(self, x, y):
+        """Get the unit move direction at one position, or None if there is no route"""
+        dx, dy, valid = self.directions(np.array([x], dtype=float), np.array([y], dtype=float))
+        if not valid[0]:
+            return None
+        return float(dx[0]), float(dy[0])
@@ -1,142 +1,107 @@
 import pygame
-import json
-import settings
-from settings import TILE_SIZE, MAP_WIDTH, MAP_HEIGHT
+import numpy as np
+from settings import REQUIRED_POINTS
+from game.terrain import TerrainRenderer
+from game.minimap import MinimapImage
+from game.tiles import BORDER_TILE, tile_registry
+from game.mapfile import load_map_file, find_features
+from game.features import MapFeatures
 
 class Map:
     def __init__(self, file_path="./maps/map000.txt"):
-        self.data = self.load_map(file_path)
-        self.add_border_to_map()
-        self.tile_info = self.load_tile_info()
-
         self.map_number = self.extract_map_number(file_path)
+        self.set_registry(tile_registry())
+
+        self.spawn = None
+        self.teleporters = []
         self.data = self.load_map(file_path)
-        self.add_border_to_map()
-        self.tile_info = self.load_tile_info()
-    def load_tile_info(self):
-        """Load tile information from mapdata.json"""
-        try:
-            with open("./mapdata.json", 'r') as f:
-                map_data = json.load(f)
-                return map_data.get("tiles", {})
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading mapdata.json: {e}")
-            return {}
-        
+        self.build_tile_arrays()
+        self.features = MapFeatures(self.spawn, self.teleporters, self.collidable, self.category)
+        self.revision = 0  # Bumped on every tile change so cached renders know to refresh
+
+        # Pre-rendered terrain chunks, built lazily as they come into view
+        self.terrain = TerrainRenderer(self)
+        self.minimap = MinimapImage(self)
+
+    def set_registry(self, registry):
+        """Read tile properties from a tile registry"""
+        self.tiles = registry
+        self.tile_info = registry.tile_info
+        self.collidable_lut = registry.collidable
+        self.category_lut = registry.category
+
+    def reload_tiles(self, registry):
+        """Switch to a reloaded tile registry, refreshing everything derived from it"""
+        self.set_registry(registry)
+        self.build_tile_arrays()
+        self.spawn, self.teleporters = find_features(self.data, self.category_lut)
+        self.features = MapFeatures(self.spawn, self.teleporters, self.collidable, self.category)
+        self.terrain.invalidate_all()
+        self.minimap.invalidate()
+        self.revision += 1
+
     def load_map(self, file_path):
-        """Load map data from a file of any dimensions"""
+        """Load the bordered map grid from its compiled form, rebuilding it if stale"""
         try:
-            with open(file_path, 'r') as f:
-                lines = [line.strip() for line in f if line.strip()]
-                
-                # First determine the maximum width
-                max_width = 0
-                for line in lines:
-                    # Split by any whitespace (space, tab) and count elements
-                    nums = line.split()
-                    max_width = max(max_width, len(nums))
-                
-                # Now create the map data with consistent width
-                map_data = []
-                for line in lines:
-                    nums = [int(num) for num in line.split()]
-                    # Pad with grass (1) if the row is shorter than max_width
-                    while len(nums) < max_width:
-                        nums.append(1)  # Use grass (1) as default filler
-                    map_data.append(nums)
-            
-            # Update global map dimensions
-            settings.MAP_HEIGHT = len(map_data)
-            settings.MAP_WIDTH = max_width
-            
-            return map_data
-            
+            compiled = load_map_file(file_path, self.category_lut)
+            self.spawn = compiled.spawn
+            self.teleporters = compiled.teleporters
+            map_data = compiled.data
+
         except FileNotFoundError:
             print(f"Map file not found: {file_path}")
             # Return a small default map if file not found
-            default_map = [[1, 1, 1], [1, 0, 1], [1, 1, 1]]  # Simple 3x3 map with spawn in center
-            settings.MAP_HEIGHT = len(default_map)
-            settings.MAP_WIDTH = len(default_map[0])
-            return default_map
+            map_data = self.add_border_to_map(np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]], dtype=np.uint8))  # Simple 3x3 map with spawn in center
+            self.spawn = (2, 2)
         except Exception as e:
             print(f"Error loading map: {e}")
             # Return a minimal map in case of other errors
-            default_map = [[1, 0, 1], [1, 1, 1]]
-            settings.MAP_HEIGHT = len(default_map)
-            settings.MAP_WIDTH = len(default_map[0])
-            return default_map
+            map_data = self.add_border_to_map(np.array([[1, 0, 1], [1, 1, 1]], dtype=np.uint8))
+            self.spawn = (2, 1)
+
+        return map_data
+
+    @property
+    def required_points(self):
+        """Points needed to take this map's teleporters to the next map: 5 for map 0, 10 for map 1, etc."""
+        return (self.map_number + 1) * REQUIRED_POINTS
     
-    def add_border_to_map(self):
+    def add_border_to_map(self, map_data):
         """Add a border of bedrock around the map"""
-        bordered_map = []
-        bordered_map.append([9] * (settings.MAP_WIDTH + 2))  # Top border
-        for row in self.data:
-            bordered_map.append([9] + row + [9])   # Side borders
-        bordered_map.append([9] * (settings.MAP_WIDTH + 2))  # Bottom border
-        
-        # Update global map dimensions
-        settings.MAP_WIDTH = len(bordered_map[0])
-        settings.MAP_HEIGHT = len(bordered_map)
-        self.data = bordered_map
-    
+        return np.pad(map_data, 1, mode='constant', constant_values=BORDER_TILE)
+
+    def build_tile_arrays(self):
+        """Precompute the collidability and category grids parallel to the tile grid"""
+        self.collidable = self.collidable_lut[self.data]
+        self.category = self.category_lut[self.data]
+
     def find_spawn_location(self):
-        """Find the spawn point (tile 0) in the map"""
-        for y in range(settings.MAP_HEIGHT):
-            for x in range(settings.MAP_WIDTH):
-                if self.data[y][x] == 0:  # 0 is the spawn tile
-                    return pygame.Vector2(x, y)
-        
-        # Fallback to position 1,1 if no spawn point found
-        return pygame.Vector2(1, 1)
+        """Get the spawn point (tile 0) of the map"""
+        # Found once at load time, from the compiled map header
+        return pygame.Vector2(self.features.spawn)
     
     def get_tile_name(self, tile_id):
-        """Get the name of a tile based on its ID using the JSON data"""
-        tile_str_id = str(tile_id)
-        if tile_str_id in self.tile_info:
-            return self.tile_info[tile_str_id].get("name", "Unknown")
-        return "Unknown"
+        """Get the name of a tile based on its ID"""
+        return self.tiles.name(int(tile_id))
     
     def is_tile_collidable(self, tile_id):
-        """Check if a tile is collidable based on JSON data"""
-        tile_str_id = str(tile_id)
-        if tile_str_id in self.tile_info:
-            return self.tile_info[tile_str_id].get("collidable", False)
-        return False  # Default to non-collidable
+        """Check if a tile is collidable"""
+        return self.tiles.is_collidable(int(tile_id))
     
-    def draw(self, screen, textures, camera_pos):
-        """Draw visible parts of the map efficiently"""
-        # Calculate the visible area
-        screen_width, screen_height = screen.get_width(), screen.get_height()
-        
-        # Get fallback texture
-        fallback_texture = textures.get('fallback') or textures.get(1) or next(iter(textures.values()))
-        
-        # Determine which tiles are visible based on camera position
-        start_x = max(0, int(camera_pos.x // TILE_SIZE) - 1)
-        start_y = max(0, int(camera_pos.y // TILE_SIZE) - 1)
-        end_x = min(settings.MAP_WIDTH, start_x + (screen_width // TILE_SIZE) + 3)
-        end_y = min(settings.MAP_HEIGHT, start_y + (screen_height // TILE_SIZE) + 3)
-        
-        # Draw only visible tiles
-        for y in range(start_y, end_y):
-            for x in range(start_x, end_x):
-                # Calculate screen position
-                screen_x = x * TILE_SIZE - camera_pos.x
-                screen_y = y * TILE_SIZE - camera_pos.y
-                
-                # Only draw if within visible screen area
-                if (-TILE_SIZE <= screen_x <= screen_width and 
-                    -TILE_SIZE <= screen_y <= screen_height):
-                    # Draw the tile
-                    tile_id = self.data[y][x]
-                    texture = textures['tile_mapping'].get(tile_id)
-                    
-                    # If texture is None, use fallback
-                    if texture is None:
-                        texture = fallback_texture
-                        
-                    screen.blit(texture, (screen_x, screen_y))
+    def set_tile(self, x, y, tile_id):
+        """Change a single tile and rebuild only the chunk that contains it"""
+        if tile_id > np.iinfo(self.data.dtype).max:
+            self.data = self.data.astype(np.uint16)
+        self.data[y, x] = tile_id
+        self.collidable[y, x] = self.collidable_lut[tile_id]
+        self.category[y, x] = self.category_lut[tile_id]
+        self.terrain.invalidate_tile(x, y)
+        self.minimap.update_tile(x, y)
+        self.revision += 1
 
+    def draw(self, screen, textures, camera_pos):
+        """Draw the visible chunks of the map"""
+        self.terrain.draw(screen, textures, camera_pos)
 
     def extract_map_number(self, file_path):
         """Extract map number from file path"""
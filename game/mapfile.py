@@ -0,0 +1,183 @@
+"""Compiled binary map format.
+
+The whitespace separated text maps in maps/ stay the source format. Each one
+is compiled to maps/compiled/mapNNN.rpgm, which holds the bordered grid ready
+to be memory-mapped:
+
+    header       magic, version, tile id width, dimensions, source stamp,
+                 tile table checksum, spawn point and teleporter count
+    teleporters  (x, y, category) per teleporter cell
+    payload      width * height tile ids, row major, little-endian
+
+Run `python -m game.mapfile` to compile every map up front.
+"""
+import os
+import sys
+import struct
+import zlib
+import numpy as np
+from game.tiles import (FILLER_TILE, BORDER_TILE, TILE_SPAWN, TILE_TELEPORT_NEXT,
+                        TILE_TELEPORT_PREV, tile_dtype)
+
+MAGIC = b"RPGM"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxIIqqIiiI")
+TELEPORTER = struct.Struct("<iiI")
+PAYLOAD_ALIGN = 8
+
+
+class CompiledMap:
+    """A bordered tile grid together with the metadata from its header"""
+
+    def __init__(self, data, spawn, teleporters):
+        self.data = data
+        self.spawn = spawn  # (x, y) or None
+        self.teleporters = teleporters  # [(x, y, category), ...]
+
+
+def compiled_path_for(text_path):
+    """Get the path of the compiled artifact for a text map"""
+    directory, name = os.path.split(text_path)
+    return os.path.join(directory, "compiled", os.path.splitext(name)[0] + ".rpgm")
+
+
+def read_text_map(text_path):
+    """Parse a text map into a bordered tile grid"""
+    with open(text_path, 'r') as f:
+        # Split by any whitespace (space, tab)
+        rows = [line.split() for line in f if line.strip()]
+
+    # Start from a grid filled with grass so short rows are padded
+    max_width = max((len(row) for row in rows), default=0)
+    values = np.full((len(rows), max_width), FILLER_TILE, dtype=np.int64)
+    for y, row in enumerate(rows):
+        values[y, :len(row)] = np.array(row, dtype=np.int64)
+
+    grid = values.astype(tile_dtype(values))
+    return np.pad(grid, 1, mode='constant', constant_values=BORDER_TILE)
+
+
+def tiles_checksum(category_lut):
+    """Checksum of the tile categories the header metadata was derived from"""
+    return zlib.crc32(category_lut.tobytes())
+
+
+def find_features(grid, category_lut):
+    """Find the spawn point and teleporter cells of a grid"""
+    category = category_lut[grid]
+
+    spawns = np.argwhere(category == TILE_SPAWN)
+    spawn = (int(spawns[0][1]), int(spawns[0][0])) if len(spawns) else None
+
+    teleporters = []
+    for kind in (TILE_TELEPORT_NEXT, TILE_TELEPORT_PREV):
+        for y, x in np.argwhere(category == kind):
+            teleporters.append((int(x), int(y), kind))
+
+    return spawn, teleporters
+
+
+def payload_offset(teleporter_count):
+    end = HEADER.size + TELEPORTER.size * teleporter_count
+    return -(-end // PAYLOAD_ALIGN) * PAYLOAD_ALIGN
+
+
+def compile_map(text_path, category_lut, out_path=None):
+    """Compile a text map to the binary format and return the output path"""
+    out_path = out_path or compiled_path_for(text_path)
+    grid = read_text_map(text_path)
+    spawn, teleporters = find_features(grid, category_lut)
+    stat = os.stat(text_path)
+
+    height, width = grid.shape
+    spawn_x, spawn_y = spawn if spawn else (-1, -1)
+    header = HEADER.pack(MAGIC, VERSION, grid.dtype.itemsize, width, height,
+                         stat.st_mtime_ns, stat.st_size, tiles_checksum(category_lut),
+                         spawn_x, spawn_y, len(teleporters))
+
+    offset = payload_offset(len(teleporters))
+    records = b"".join(TELEPORTER.pack(*teleporter) for teleporter in teleporters)
+    padding = b"\0" * (offset - len(header) - len(records))
+
+    # Write to a temporary file and swap it in so maps that are still
+    # mapped from the old artifact keep their pages
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header + records + padding)
+        f.write(grid.astype(grid.dtype.newbyteorder('<'), copy=False).tobytes())
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def read_header(compiled_path):
+    """Read the header and teleporter table of a compiled map"""
+    with open(compiled_path, 'rb') as f:
+        fields = HEADER.unpack(f.read(HEADER.size))
+        magic, version = fields[0], fields[1]
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} compiled map: {compiled_path}")
+        teleporter_count = fields[-1]
+        table = f.read(TELEPORTER.size * teleporter_count)
+    teleporters = [TELEPORTER.unpack_from(table, i * TELEPORTER.size) for i in range(teleporter_count)]
+    return fields, teleporters
+
+
+def is_stale(text_path, compiled_path, category_lut):
+    """Check whether a compiled map no longer matches its text source"""
+    try:
+        fields, _ = read_header(compiled_path)
+    except (OSError, ValueError, struct.error):
+        return True
+
+    stat = os.stat(text_path)
+    source_mtime, source_size, checksum = fields[5], fields[6], fields[7]
+    return (source_mtime != stat.st_mtime_ns or source_size != stat.st_size
+            or checksum != tiles_checksum(category_lut))
+
+
+def load_compiled(compiled_path):
+    """Memory-map a compiled map without copying its payload"""
+    fields, teleporters = read_header(compiled_path)
+    tile_bytes, width, height = fields[2], fields[3], fields[4]
+    spawn_x, spawn_y = fields[8], fields[9]
+
+    dtype = np.dtype('<u1') if tile_bytes == 1 else np.dtype('<u2')
+    # Copy-on-write: edits through Map.set_tile never reach the file
+    data = np.memmap(compiled_path, dtype=dtype, mode='c',
+                     offset=payload_offset(len(teleporters)), shape=(height, width))
+
+    spawn = (spawn_x, spawn_y) if spawn_x >= 0 else None
+    return CompiledMap(data, spawn, [tuple(t) for t in teleporters])
+
+
+def load_map_file(text_path, category_lut):
+    """Load a map, rebuilding its compiled artifact when it is stale"""
+    compiled_path = compiled_path_for(text_path)
+
+    # A compiled map can ship without its text source
+    if not os.path.exists(text_path):
+        if os.path.exists(compiled_path):
+            return load_compiled(compiled_path)
+        raise FileNotFoundError(text_path)
+
+    if is_stale(text_path, compiled_path, category_lut):
+        try:
+            compile_map(text_path, category_lut, compiled_path)
+        except OSError as e:
+            # Read-only install: fall back to parsing the text map in memory
+            print(f"Could not write compiled map {compiled_path}: {e}")
+            grid = read_text_map(text_path)
+            return CompiledMap(grid, *find_features(grid, category_lut))
+
+    return load_compiled(compiled_path)
+
+
+if __name__ == "__main__":
+    import glob
+    from game.tiles import tile_registry
+
+    lut = tile_registry().category
+
+    for path in sys.argv[1:] or sorted(glob.glob("./maps/map*.txt")):
+        print(f"{path} -> {compile_map(path, lut)}")
@@ -0,0 +1,85 @@
+import pygame
+
+
+class MinimapImage:
+    """One pixel per tile picture of a map, built once and patched as tiles change"""
+
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.surface = None
+
+    def get(self):
+        """Get the image, downsampling the map into it on first use"""
+        if self.surface is None:
+            colors = self.game_map.tiles.colors[self.game_map.data]  # (height, width, 3)
+            self.surface = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+        return self.surface
+
+    def update_tile(self, x, y):
+        """Recolour the pixel of a changed tile"""
+        if self.surface is not None:
+            self.surface.set_at((x, y), tuple(self.game_map.tiles.colors[self.game_map.data[y, x]]))
+
+    def invalidate(self):
+        self.surface = None
+
+
+class Minimap:
+    """Window onto the current map's minimap image, scrolled to follow the player
+
+    The scaled terrain is only rebuilt when the window scrolls by a tile, the
+    zoom changes or a tile changes, and costs the window's pixels rather than
+    the map's size. Markers are drawn onto a copy each frame.
+    """
+
+    size = 100  # Window side in screen pixels
+    zoom_levels = (1, 2, 4, 8)  # Screen pixels per tile
+    background = (0x62, 0x54, 0x65)
+    player_color = "#e83b3b"
+    npc_color = "#03ff00"
+
+    def __init__(self, zoom=2):
+        self.zoom = zoom
+        self.terrain = pygame.Surface((self.size, self.size))
+        self.frame = pygame.Surface((self.size, self.size))
+        self.key = None
+
+    def zoom_in(self):
+        self.zoom = min(self.zoom * 2, self.zoom_levels[-1])
+
+    def zoom_out(self):
+        self.zoom = max(self.zoom // 2, self.zoom_levels[0])
+
+    def window(self, player, map_width, map_height):
+        """Get the (left, top, tiles) window of tiles shown, kept inside the map"""
+        tiles = self.size // self.zoom
+        left = min(max(0, int(player.pos.x) - tiles // 2), max(0, map_width - tiles))
+        top = min(max(0, int(player.pos.y) - tiles // 2), max(0, map_height - tiles))
+        return left, top, tiles
+
+    def draw(self, screen, player, npc_index, pos):
+        """Draw the window with player and nearby NPC markers, returning the rect covered"""
+        game_map = player.game_map
+        map_height, map_width = game_map.data.shape
+        left, top, tiles = self.window(player, map_width, map_height)
+        zoom = self.zoom
+
+        key = (game_map, game_map.revision, left, top, zoom)
+        if key != self.key:
+            self.key = key
+            self.terrain.fill(self.background)
+            area = pygame.Rect(left, top, tiles, tiles).clip(pygame.Rect(0, 0, map_width, map_height))
+            if area.width and area.height:
+                visible = game_map.minimap.get().subsurface(area)
+                self.terrain.blit(pygame.transform.scale(visible, (area.width * zoom, area.height * zoom)), (0, 0))
+
+        self.frame.blit(self.terrain, (0, 0))
+        pygame.draw.circle(self.frame, self.player_color,
+                           ((player.pos.x - left) * zoom, (player.pos.y - top) * zoom), 3)
+
+        # Only NPCs inside the window, found through the spatial index
+        for npc in npc_index.query_rect(left, top, left + tiles, top + tiles):
+            npc_pos = npc.pos
+            pygame.draw.circle(self.frame, self.npc_color, ((npc_pos.x - left) * zoom, (npc_pos.y - top) * zoom), 2)
+
+        return screen.blit(self.frame, pos)
@@ -0,0 +1,67 @@
+import pygame
+
+
+class DirtyRectRenderer:
+    """Presents only the screen regions that changed while the camera stands still
+
+    The world (background fill and terrain) is drawn in full and kept as a
+    cached background whenever the camera moves, the window is resized or
+    the map changes. On other frames only the rects marked last frame are
+    restored from that background before sprites and overlays are drawn
+    again, and just those regions are pushed to the display. When disabled
+    every frame is a full redraw presented with a flip.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.background = None
+        self.view = None  # (camera x, camera y, screen size, map, map revision) of the background
+        self.full = True
+        self.previous = []  # Rects drawn over the background last frame
+        self.current = []
+
+    def begin(self, screen, camera_pos, game_map):
+        """Start a frame; returns True when the world has to be drawn in full"""
+        self.current = []
+        if not self.enabled:
+            return True
+
+        view = (int(camera_pos.x), int(camera_pos.y), screen.get_size(), game_map, game_map.revision)
+        self.full = self.background is None or view != self.view
+        self.view = view
+        if not self.full:
+            # Erase last frame's sprites and overlays
+            for rect in self.previous:
+                screen.blit(self.background, rect, rect)
+        return self.full
+
+    def capture(self, screen):
+        """Keep the freshly drawn world as the background for the following frames"""
+        if self.enabled:
+            if self.background is None or self.background.get_size() != screen.get_size():
+                self.background = screen.copy()
+            else:
+                self.background.blit(screen, (0, 0))
+
+    def mark(self, rects):
+        """Record regions drawn over the background this frame"""
+        if not self.enabled or not rects:
+            return
+        if isinstance(rects, pygame.Rect):
+            rects = (rects,)
+        for rect in rects:
+            if rect.width and rect.height:
+                self.current.append(rect)
+
+    def present(self):
+        """Push the frame to the display: a flip after a full redraw, otherwise only what changed"""
+        if not self.enabled or self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+        self.current = []
+
+    def invalidate(self):
+        """Force a full redraw on the next frame"""
+        self.background = None
@@ -0,0 +1,101 @@
+"""Recorded game sessions.
+
+A session is fully determined by its starting map, points and RNG seed plus
+the keys held on every simulation tick, so that is all a replay stores:
+
+    header  magic, version, tick rate, seed, starting points, map path
+    ticks   one little-endian uint16 bitmask of REPLAY_KEYS per tick
+
+Ticks are buffered and appended in blocks, so a replay can be recorded for
+as long as a session lasts and read back even if the game did not exit cleanly.
+"""
+import struct
+from array import array
+import numpy as np
+import pygame
+from game.simulation import KeyState
+
+MAGIC = b"RPGR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqiH")  # magic, version, tick rate, seed, points, map path length
+
+# Keys the simulation reads; bit i of a tick's mask is REPLAY_KEYS[i]
+REPLAY_KEYS = (pygame.K_w, pygame.K_UP, pygame.K_s, pygame.K_DOWN,
+               pygame.K_a, pygame.K_LEFT, pygame.K_d, pygame.K_RIGHT,
+               pygame.K_LSHIFT, pygame.K_RSHIFT, pygame.K_SPACE, pygame.K_r)
+
+
+def key_mask(keys):
+    """Pack the state of REPLAY_KEYS into a bitmask"""
+    mask = 0
+    for bit, key in enumerate(REPLAY_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+
+def keys_from_mask(mask):
+    return KeyState(key for bit, key in enumerate(REPLAY_KEYS) if mask >> bit & 1)
+
+
+class ReplayRecorder:
+    """Streams the keys of every tick of a session to a replay file"""
+
+    def __init__(self, path, seed, map_path, points=0, tick_rate=60, buffer_ticks=4096):
+        self.path = path
+        self.file = open(path, 'wb')
+        encoded_path = map_path.encode("utf-8")
+        self.file.write(HEADER.pack(MAGIC, VERSION, tick_rate, seed, points, len(encoded_path)))
+        self.file.write(encoded_path)
+        self.buffer = array('H')
+        self.buffer_ticks = buffer_ticks
+        self.ticks = 0
+
+    def record(self, keys):
+        self.buffer.append(key_mask(keys))
+        self.ticks += 1
+        if len(self.buffer) >= self.buffer_ticks:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(np.asarray(self.buffer, dtype="<u2").tobytes())
+            del self.buffer[:]
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+
+class Replay:
+    """A recorded session read back from disk"""
+
+    def __init__(self, seed, map_path, points, tick_rate, masks):
+        self.seed = seed
+        self.map_path = map_path
+        self.points = points
+        self.tick_rate = tick_rate
+        self.masks = masks  # uint16 array, one per tick
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            magic, version, tick_rate, seed, points, path_length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} replay")
+            map_path = f.read(path_length).decode("utf-8")
+            data = f.read()
+        # A recording cut short may end in half a tick
+        masks = np.frombuffer(data[:len(data) // 2 * 2], dtype="<u2")
+        return cls(seed, map_path, points, tick_rate, masks)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def key_states(self):
+        """Get the KeyState of every tick, sharing one object per distinct mask"""
+        states = {int(mask): keys_from_mask(int(mask)) for mask in np.unique(self.masks)}
+        return [states[mask] for mask in self.masks.tolist()]
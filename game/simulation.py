@@ -0,0 +1,180 @@
+import os
+import random
+import zlib
+import settings
+from game.streaming import MapStreamer
+from game.ecs import World
+from game.systems import (remember_positions, chase_system, jump_system, movement_system, animation_system,
+                          stomp_system, sound_system)
+from game.flowfield import FlowField
+from game.tiles import tile_registry
+from entities.player import Player
+from entities.swarm import NPCSwarm
+from utils.sound_manager import play_sound, GameSounds
+from utils.profiler import profiler
+
+
+class KeyState:
+    """Pressed key lookup with the same indexing as pygame.key.get_pressed()"""
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+NO_KEYS = KeyState()
+
+
+class Simulation:
+    """Game state advanced in fixed ticks, independent of rendering"""
+
+    npc_count = 5  # Per map, unless given
+
+    def __init__(self, textures, map_path="./maps/map000.txt", tick_rate=None, seed=None, points=None,
+                 npc_count=None):
+        self.textures = textures
+        if npc_count is not None:
+            self.npc_count = npc_count
+        self.tick_rate = tick_rate or settings.SIM_TICK_RATE
+        self.dt = 1.0 / self.tick_rate
+        self.tick = 0
+        self.map_path = map_path
+        self.recorder = None  # ReplayRecorder that every tick's keys are written to
+
+        # Everything random in the game draws from these, so a seed and the keys reproduce a session
+        self.seed = random.SystemRandom().randrange(2 ** 62) if seed is None else seed
+        random.seed(self.seed)
+
+        # Every entity, with the points scored and the RNG of the systems
+        self.world = World(self.seed, settings.POINTS if points is None else points)
+
+        # Load map, and start preloading the maps its teleporters lead to
+        self.streamer = MapStreamer()
+        self.level = self.streamer.get(map_path)
+        self.game_map = self.level.map
+        self.streamer.prefetch_neighbours(self.game_map)
+
+        # Create player at spawn location
+        self.player = Player(self.level.spawn_location(), textures, self.game_map, self.world)
+
+        # Create initial NPCs, simulated together and indexed by position for range queries
+        self.npcs = NPCSwarm(textures, world=self.world)
+        self.npcs.spawn(self.npc_count, self.level.safe_tiles)
+        self.flow_field = FlowField(self.game_map.collidable)
+
+    @property
+    def npc_index(self):
+        return self.npcs.index
+
+    @property
+    def points(self):
+        return self.world.points
+
+    def step(self, keys):
+        """Advance the game by one tick, returning the teleport direction taken if any"""
+        dt = self.dt
+        world = self.world
+        player = self.player
+        if self.recorder is not None:
+            self.recorder.record(keys)
+
+        # Remember where everything was so rendering can interpolate
+        remember_positions(world)
+
+        # Turn keys into the player's movement
+        with profiler.scope("player"):
+            player.control(dt, keys)
+            target = (player.pos.x, player.pos.y)
+
+        # Steer NPCs close to the player, routed by the flow field
+        with profiler.scope("npcs"):
+            self.flow_field.update(int(target[0]), int(target[1]))
+            chase_system(world, dt, target, self.flow_field)
+
+        # Jump and move every entity, sliding along walls, and pick its animation frame
+        with profiler.scope("movement"):
+            jump_system(world, dt)
+            movement_system(world, dt, self.game_map.collidable)
+            animation_system(world, dt)
+            self.npcs.sync_index()
+
+        # Process collisions
+        with profiler.scope("collisions"):
+            self.npcs.forget(stomp_system(world))
+            sound_system(world, player.pos)
+
+            # Respawn NPCs if needed
+            if len(self.npcs) < self.npc_count:
+                self.npcs.spawn(self.npc_count - len(self.npcs), self.level.safe_tiles)
+
+        # Check if teleportation is complete
+        teleport_direction = player.advance_teleport(dt)
+        player.check_teleportation(self.game_map.data)
+        if teleport_direction:
+            with profiler.scope("level_change"):
+                self.change_level(teleport_direction)
+
+        self.tick += 1
+        return teleport_direction
+
+    def change_level(self, direction):
+        """Swap in the next or previous map after a teleport"""
+        if direction == "next":
+            map_path = self.game_map.get_next_map_path()
+        else:
+            map_path = self.game_map.get_previous_map_path()
+        if not os.path.exists(map_path):
+            return
+
+        # Usually already preloaded, making this a simple swap
+        self.level = self.streamer.get(map_path)
+        self.game_map = self.level.map
+
+        player = self.player
+        player.pos = self.level.spawn_location()
+        player.prev_pos = player.pos  # Don't interpolate across maps
+        player.game_map = self.game_map  # Update player's game_map reference
+        player.teleporting = False  # Reset the teleporting state
+
+        # Create new NPCs for the new map
+        self.npcs.clear()
+        self.npcs.spawn(self.npc_count, self.level.safe_tiles)
+        self.flow_field = FlowField(self.game_map.collidable)
+        self.streamer.prefetch_neighbours(self.game_map)
+
+        # Play level complete sound, quieter when going back
+        if direction == "next":
+            play_sound(GameSounds.LEVEL_COMPLETE, settings.SFX_VOLUME)
+        else:
+            play_sound(GameSounds.LEVEL_COMPLETE, settings.SFX_VOLUME * 0.7)
+
+    def reload_tiles(self, textures):
+        """Pick up a reloaded tile registry and the textures loaded for it"""
+        registry = tile_registry()
+        self.streamer.reload_tiles(registry)
+        if self.game_map.tiles is not registry:
+            self.level.reload_tiles(registry)
+        self.flow_field = FlowField(self.game_map.collidable)
+        self.textures = textures
+        self.player.set_textures(textures)
+        self.npcs.set_textures(textures)
+
+    def run(self, ticks, keys_for_tick=None):
+        """Run ticks back to back with no rendering, as fast as the CPU allows"""
+        for _ in range(ticks):
+            keys = keys_for_tick(self.tick) if keys_for_tick else NO_KEYS
+            self.step(keys)
+
+    def state_digest(self):
+        """Short hash of the game state, for checking that a replay reproduced a session"""
+        player = self.player
+        state = (self.game_map.map_number, self.world.points, round(player.pos.x, 6), round(player.pos.y, 6),
+                 len(self.npcs), self.npcs.pos[:len(self.npcs)].round(6).tobytes())
+        return f"{zlib.crc32(repr(state).encode()):08x}"
+
+    def shutdown(self):
+        if self.recorder is not None:
+            self.recorder.close()
+        self.streamer.shutdown()
@@ -0,0 +1,72 @@
+import math
+import settings
+
+
+class SpatialHash:
+    """Uniform grid index of entities keyed by the tile cell their position falls in
+
+    The minimap finds the NPCs inside its window through it; the systems
+    test overlaps and ranges over whole archetypes with array operations.
+    """
+
+    def __init__(self, cell_size=None):
+        self.cell_size = cell_size or settings.SPATIAL_CELL_SIZE  # In tiles
+        # (cell_x, cell_y) -> entities in insertion order (dicts keep iteration deterministic)
+        self.cells = {}
+        self.entity_cells = {}
+
+    def __len__(self):
+        return len(self.entity_cells)
+
+    def __iter__(self):
+        return iter(self.entity_cells)
+
+    def __contains__(self, entity):
+        return entity in self.entity_cells
+
+    def cell_of(self, x, y):
+        """Get the cell containing a position in tiles"""
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def insert(self, entity):
+        cell = self.cell_of(entity.pos.x, entity.pos.y)
+        self.cells.setdefault(cell, {})[entity] = None
+        self.entity_cells[entity] = cell
+
+    def remove(self, entity):
+        cell = self.entity_cells.pop(entity, None)
+        if cell is None:
+            return
+        bucket = self.cells[cell]
+        del bucket[entity]
+        if not bucket:
+            del self.cells[cell]
+
+    def update(self, entity):
+        """Move an entity to its new cell, if its position crossed into one"""
+        cell = self.cell_of(entity.pos.x, entity.pos.y)
+        if self.entity_cells.get(entity) != cell:
+            self.remove(entity)
+            self.cells.setdefault(cell, {})[entity] = None
+            self.entity_cells[entity] = cell
+
+    def clear(self):
+        self.cells.clear()
+        self.entity_cells.clear()
+
+    def query_rect(self, left, top, right, bottom):
+        """Get entities positioned within a rectangle given in tiles (edges inclusive)"""
+        min_cx, min_cy = self.cell_of(left, top)
+        max_cx, max_cy = self.cell_of(right, bottom)
+
+        found = []
+        for cell_y in range(min_cy, max_cy + 1):
+            for cell_x in range(min_cx, max_cx + 1):
+                bucket = self.cells.get((cell_x, cell_y))
+                if not bucket:
+                    continue
+                for entity in bucket:
+                    pos = entity.pos
+                    if left <= pos.x <= right and top <= pos.y <= bottom:
+                        found.append(entity)
+        return found
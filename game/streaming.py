@@ -0,0 +1,97 @@
+import os
+import pygame
+import settings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from game.map import Map
+
+
+class Level:
+    """A loaded map together with everything needed to start playing on it"""
+
+    def __init__(self, path):
+        self.path = path
+        self.map = Map(path)
+        self.spawn = self.map.find_spawn_location()
+
+    def spawn_location(self):
+        """Get a fresh copy of the spawn point"""
+        return pygame.Vector2(self.spawn)
+
+    @property
+    def safe_tiles(self):
+        return self.map.features.safe_cells
+
+    def reload_tiles(self, registry):
+        self.map.reload_tiles(registry)
+        self.spawn = self.map.find_spawn_location()
+
+
+class MapStreamer:
+    """Load levels on a worker thread and keep recently used ones in an LRU"""
+
+    def __init__(self, cache_size=None):
+        self.cache_size = cache_size or settings.LEVEL_CACHE_SIZE
+        self.cache = OrderedDict()  # path -> Level, least recently used first
+        self.pending = {}  # path -> Future of a Level
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="map-streamer")
+
+    def key(self, path):
+        return os.path.normpath(path)
+
+    def store(self, key, level):
+        self.cache[key] = level
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            _, evicted = self.cache.popitem(last=False)
+            evicted.map.terrain.invalidate_all()
+            evicted.map.minimap.invalidate()
+
+    def reload_tiles(self, registry):
+        """Apply a reloaded tile registry to every cached level; loads in flight are dropped"""
+        self.pending.clear()
+        for level in self.cache.values():
+            level.reload_tiles(registry)
+
+    def collect(self):
+        """Move finished background loads into the cache"""
+        for key, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[key]
+                try:
+                    self.store(key, future.result())
+                except Exception as e:
+                    print(f"Error preloading map {key}: {e}")
+
+    def prefetch(self, path):
+        """Start loading a level in the background if it is not already available"""
+        key = self.key(path)
+        if key in self.cache or key in self.pending or not os.path.exists(path):
+            return
+        self.pending[key] = self.executor.submit(Level, path)
+
+    def prefetch_neighbours(self, game_map):
+        """Preload the levels the teleporters of a map lead to"""
+        self.collect()
+        teleporters = game_map.features.teleporters
+        if teleporters["next"]:
+            self.prefetch(game_map.get_next_map_path())
+        if teleporters["previous"]:
+            self.prefetch(game_map.get_previous_map_path())
+
+    def get(self, path):
+        """Get a level, waiting for its background load or loading it now if needed"""
+        self.collect()
+        key = self.key(path)
+
+        level = self.cache.get(key)
+        if level is None:
+            future = self.pending.pop(key, None)
+            level = future.result() if future else Level(path)
+
+        self.store(key, level)
+        return level
+
+    def shutdown(self):
+        """Stop the worker thread, dropping loads that have not started"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,171 @@
+"""Swept box movement against the collidability grid.
+
+Boxes are axis-aligned, in tiles, and cover [left, left + width) by
+[top, top + height). A move is swept along x and then along y, so boxes
+slide along walls. Along each axis the box's leading edge steps through the
+tile lines it crosses, like a DDA traversal, and stops flush with the first
+line holding a collidable tile. Tiles outside the map count as collidable.
+A box already overlapping a collidable tile is free to move out of it.
+
+The cost depends on the number of tiles crossed, never on the map size, and
+the result is the same at any speed without substeps.
+"""
+import math
+import numpy as np
+from utils.scratch import ScratchBuffers
+
+# Edges within this of a tile line count as touching it, not overlapping the tile beyond,
+# so rounding in a stopped box's position never lets it skip the line it stopped at
+EPSILON = 1e-9
+
+# Work arrays of the vectorized sweep
+scratch = ScratchBuffers()
+
+
+def line_blocked(collidable, axis, line, cross_lo, cross_hi):
+    """Check a column (axis 0) or row (axis 1) of tiles over the cross-axis span [cross_lo, cross_hi)"""
+    height, width = collidable.shape
+    first = math.floor(cross_lo + EPSILON)
+    last = math.ceil(cross_hi - EPSILON) - 1
+    if axis == 0:
+        if not 0 <= line < width or first < 0 or last >= height:
+            return True
+        return bool(collidable[first:last + 1, line].any())
+    if not 0 <= line < height or first < 0 or last >= width:
+        return True
+    return bool(collidable[line, first:last + 1].any())
+
+
+def sweep_axis(collidable, axis, lo, hi, delta, cross_lo, cross_hi):
+    """Get how far the span [lo, hi) can move by delta along an axis"""
+    if delta > 0:
+        # Lines newly entered, nearest first
+        for line in range(math.ceil(hi - EPSILON), math.ceil(hi + delta - EPSILON)):
+            if line_blocked(collidable, axis, line, cross_lo, cross_hi):
+                return line - hi
+    elif delta < 0:
+        for line in range(math.floor(lo + EPSILON) - 1, math.floor(lo + delta + EPSILON) - 1, -1):
+            if line_blocked(collidable, axis, line, cross_lo, cross_hi):
+                return line + 1 - lo
+    return delta
+
+
+def sweep_box(collidable, left, top, width, height, dx, dy):
+    """Get the (dx, dy) a box can actually move, sliding along walls"""
+    dx = sweep_axis(collidable, 0, left, left + width, dx, top, top + height)
+    left += dx
+    dy = sweep_axis(collidable, 1, top, top + height, dy, left, left + width)
+    return dx, dy
+
+
+def cells_blocked(collidable, columns, rows, out):
+    """Vectorized collidable lookup into out, where out of map counts as blocked"""
+    height, width = collidable.shape
+    n = len(columns)
+    inside = scratch.get("inside", n, bool)
+    check = scratch.get("inside_check", n, bool)
+    np.greater_equal(columns, 0, out=inside)
+    np.less(columns, width, out=check)
+    inside &= check
+    np.greater_equal(rows, 0, out=check)
+    inside &= check
+    np.less(rows, height, out=check)
+    inside &= check
+
+    # Look up clamped cells, then override the ones outside the map
+    index = scratch.get("index", n, np.int64)
+    column = scratch.get("index_column", n, np.int64)
+    np.clip(rows, 0, height - 1, out=index)
+    index *= width
+    np.clip(columns, 0, width - 1, out=column)
+    index += column
+    np.take(collidable.reshape(-1), index, out=out, mode="clip")
+    np.logical_not(inside, out=inside)
+    out |= inside
+    return out
+
+
+def sweep_axis_short(collidable, axis, lo, hi, delta, cross_lo, cross_hi, out):
+    """Vectorized sweep_axis into out, for moves under one tile by spans at most one tile across"""
+    # At most one new line is entered, and it meets at most two cross-axis tiles
+    n = len(lo)
+    forward = scratch.get("forward", n, bool)
+    backward = scratch.get("backward", n, bool)
+    np.greater(delta, 0, out=forward)
+    np.logical_not(forward, out=backward)
+
+    # The line a forward move would enter, else the one a backward move would
+    line = scratch.get("line", n)
+    work = scratch.get("work", n)
+    np.subtract(hi, EPSILON, out=line)
+    np.ceil(line, out=line)
+    np.add(lo, EPSILON, out=work)
+    np.floor(work, out=work)
+    work -= 1
+    np.copyto(line, work, where=backward)
+
+    entering = scratch.get("entering", n, bool)
+    check = scratch.get("check", n, bool)
+    limit = scratch.get("limit", n)
+    np.add(hi, delta, out=work)
+    work -= EPSILON
+    np.greater(work, line, out=entering)
+    np.add(lo, delta, out=work)
+    work += EPSILON
+    np.add(line, 1, out=limit)
+    np.less(work, limit, out=check)
+    np.copyto(entering, check, where=backward)
+    np.not_equal(delta, 0, out=check)
+    entering &= check
+
+    line_cells = scratch.get("line_cells", n, np.int64)
+    first = scratch.get("first", n, np.int64)
+    last = scratch.get("last", n, np.int64)
+    np.copyto(line_cells, line, casting="unsafe")
+    np.add(cross_lo, EPSILON, out=work)
+    np.floor(work, out=work)
+    np.copyto(first, work, casting="unsafe")
+    np.subtract(cross_hi, EPSILON, out=work)
+    np.ceil(work, out=work)
+    np.copyto(last, work, casting="unsafe")
+    last -= 1
+
+    blocked = scratch.get("blocked", n, bool)
+    if axis == 0:
+        cells_blocked(collidable, line_cells, first, blocked)
+        blocked |= cells_blocked(collidable, line_cells, last, check)
+    else:
+        cells_blocked(collidable, first, line_cells, blocked)
+        blocked |= cells_blocked(collidable, last, line_cells, check)
+    entering &= blocked
+
+    # Stop flush with the line where blocked, else move the whole way
+    np.subtract(line, hi, out=work)
+    limit -= lo
+    np.copyto(work, limit, where=backward)
+    np.copyto(out, delta)
+    np.copyto(out, work, where=entering)
+    return out
+
+
+def sweep_boxes_short(collidable, left, top, width, height, dx, dy, out_dx=None, out_dy=None):
+    """Vectorized sweep_box for many boxes, each moving less than one tile per axis
+
+    Boxes must be at most one tile across; use sweep_box for anything larger or faster.
+    Results go to out_dx and out_dy when given, and the work arrays are reused,
+    so steady-state calls allocate nothing.
+    """
+    n = len(left)
+    out_dx = np.empty(n) if out_dx is None else out_dx
+    out_dy = np.empty(n) if out_dy is None else out_dy
+    right = scratch.get("right", n)
+    bottom = scratch.get("bottom", n)
+    moved = scratch.get("moved", n)
+
+    np.add(left, width, out=right)
+    np.add(top, height, out=bottom)
+    sweep_axis_short(collidable, 0, left, right, dx, top, bottom, out_dx)
+    np.add(left, out_dx, out=moved)
+    np.add(moved, width, out=right)
+    sweep_axis_short(collidable, 1, top, bottom, dy, moved, right, out_dy)
+    return out_dx, out_dy
@@ -0,0 +1,448 @@
+"""Systems that update the world's entities, a whole archetype at a time
+
+Each system runs over every archetype with the components (and tags) it
+needs, with array operations on their columns, so adding an entity kind
+means registering an archetype with the right components and traits, not
+adding per-object calls to the frame. Systems take an optional archetypes
+argument to run on only some of them.
+
+All the work happens in reused scratch arrays, so steady-state ticks and
+frames allocate nothing that grows with the number of entities.
+"""
+import numpy as np
+import settings
+from settings import TILE_SIZE
+from game.sweep import sweep_box, sweep_boxes_short
+from utils.sound_manager import play_sound
+from utils.scratch import ScratchBuffers
+from utils.animation import WALK_FPS
+
+# Work arrays of all systems
+scratch = ScratchBuffers()
+row_numbers = np.arange(64)
+
+DRAW_MARGIN = 2 * TILE_SIZE  # Sprites are drawn while their position is this close to the screen
+LAYER_SPAN = 2 ** 32  # Pixels of sort key per layer, so every layer sorts above all of the one below
+SCALAR_SWEEP_MAX = 8  # Up to this many moving boxes are swept one at a time, cheaper than the array calls
+
+
+def rows_of(n):
+    """Get 0..n-1, from an array kept between calls"""
+    global row_numbers
+    if len(row_numbers) < n:
+        row_numbers = np.arange(max(n, 2 * len(row_numbers)))
+    return row_numbers[:n]
+
+
+def pack(mask, name):
+    """Get the rows where mask is set, packed together so later work scales with them alone
+
+    Each set row's place in the packing is the count of set rows up to it;
+    the others are all sent to a spare entry past the end.
+    """
+    n = len(mask)
+    count = int(np.count_nonzero(mask))
+    places = scratch.get("places", n, np.int64)
+    unset = scratch.get("unset", n, bool)
+    np.copyto(places, mask)
+    np.cumsum(places, out=places)
+    places -= 1
+    np.logical_not(mask, out=unset)
+    np.copyto(places, count, where=unset)
+    rows = scratch.get(name, count + 1, np.int64)
+    np.put(rows, places, rows_of(n))
+    return rows[:count]
+
+
+def gather(pairs, rows, name):
+    """Get both columns of an (n, 2) array at some rows
+
+    Takes from the flattened pairs with mode="clip" don't buffer their output.
+    """
+    count = len(rows)
+    flat = scratch.get("flat", count, np.int64)
+    xs = scratch.get((name, "x"), count)
+    ys = scratch.get((name, "y"), count)
+    np.multiply(rows, 2, out=flat)
+    np.take(pairs.reshape(-1), flat, out=xs, mode="clip")
+    flat += 1
+    np.take(pairs.reshape(-1), flat, out=ys, mode="clip")
+    return xs, ys
+
+
+def scatter(pairs, rows, xs, ys):
+    """Set both columns of an (n, 2) array at some rows"""
+    flat = scratch.get("flat", len(rows), np.int64)
+    np.multiply(rows, 2, out=flat)
+    np.put(pairs.reshape(-1), flat, xs, mode="clip")
+    flat += 1
+    np.put(pairs.reshape(-1), flat, ys, mode="clip")
+
+
+def within(archetype, x, y, distance, out):
+    """Set out where an entity's position is less than distance from (x, y) along both axes"""
+    n = archetype.count
+    offset = scratch.get("offset", n, columns=2)
+    pair_mask = scratch.get("pair_mask", n, bool, columns=2)
+    pos = archetype["pos"]
+    np.subtract(pos[:, 0], x, out=offset[:, 0])
+    np.subtract(pos[:, 1], y, out=offset[:, 1])
+    np.abs(offset, out=offset)
+    np.less(offset, distance, out=pair_mask)
+    pair_mask.all(axis=1, out=out)
+    return out
+
+
+def moving_mask(archetype, out):
+    """Set out where an entity is awake and has a direction to move in"""
+    move = archetype["move"]
+    mask = scratch.get("moving_axis", archetype.count, bool)
+    np.not_equal(move[:, 0], 0, out=out)
+    np.not_equal(move[:, 1], 0, out=mask)
+    out |= mask
+    out &= archetype["awake"]
+    return out
+
+
+def remember_positions(world, archetypes=None):
+    """Keep the current positions as the previous tick's, for interpolation"""
+    for archetype in archetypes or world.query("pos", "prev_pos"):
+        np.copyto(archetype["prev_pos"], archetype["pos"])
+
+
+def chase_system(world, dt, target, flow_field=None, archetypes=None):
+    """Wake the chasers near a target position, steer them toward it and start their random jumps
+
+    Chasers further than their update_range trait along either axis sleep.
+    Directions follow the flow field where it has a route and point straight
+    at the target elsewhere.
+    """
+    target_x, target_y = target
+    for archetype in archetypes or world.query("pos", "move", "awake", "facing_right", "jumping",
+                                               "jump_started", "jump_timer", "chaser"):
+        n = archetype.count
+        if not n:
+            continue
+        traits = archetype.traits
+        pos = archetype["pos"]
+        awake = archetype["awake"]
+        jumping = archetype["jumping"]
+        started = archetype["jump_started"]
+        move = archetype["move"]
+        work = scratch.get("work", n)
+        mask = scratch.get("mask", n, bool)
+
+        within(archetype, target_x, target_y, traits["update_range"], awake)
+
+        # Random jumping
+        world.rng.random(out=work)
+        np.less(work, traits["jump_chance"], out=started)
+        started &= awake
+        np.logical_not(jumping, out=mask)
+        started &= mask
+        jumping |= started
+        np.copyto(archetype["jump_timer"], 0, where=started)
+
+        # Head straight for the target
+        np.subtract(target_x, pos[:, 0], out=move[:, 0])
+        np.subtract(target_y, pos[:, 1], out=move[:, 1])
+        length = scratch.get("length", n)
+        np.hypot(move[:, 0], move[:, 1], out=length)
+        moving = scratch.get("moving", n, bool)
+        np.greater(length, 0, out=moving)
+        moving &= awake
+        np.logical_not(moving, out=mask)
+        np.copyto(move[:, 0], 0, where=mask)
+        np.copyto(move[:, 1], 0, where=mask)
+        np.divide(move[:, 0], length, out=move[:, 0], where=moving)
+        np.divide(move[:, 1], length, out=move[:, 1], where=moving)
+
+        # Route around obstacles where the flow field has a path
+        if flow_field is not None:
+            rows = pack(moving, "rows")
+            count = len(rows)
+            if count:
+                xs, ys = gather(pos, rows, "pos")
+                routed_x = scratch.get("routed_x", count)
+                routed_y = scratch.get("routed_y", count)
+                routed = scratch.get("routed", count, bool)
+                flow_field.directions(xs, ys, out=(routed_x, routed_y, routed))
+                mask.fill(False)
+                np.place(mask, moving, routed)
+                np.place(work, moving, routed_x)
+                np.copyto(move[:, 0], work, where=mask)
+                np.place(work, moving, routed_y)
+                np.copyto(move[:, 1], work, where=mask)
+
+        # Face the way they move
+        facing_right = archetype["facing_right"]
+        np.greater(move[:, 0], 0, out=mask)
+        np.copyto(facing_right, True, where=mask)
+        np.less(move[:, 0], 0, out=mask)
+        np.copyto(facing_right, False, where=mask)
+
+
+def jump_system(world, dt, archetypes=None):
+    """Advance the jumps of awake entities, up to their max_jump_height trait and down again over a second"""
+    for archetype in archetypes or world.query("awake", "jumping", "jump_timer", "jump_height"):
+        n = archetype.count
+        if not n:
+            continue
+        jumping_now = archetype["jumping"]
+        timer = archetype["jump_timer"]
+        height = archetype["jump_height"]
+        work = scratch.get("work", n)
+        mask = scratch.get("mask", n, bool)
+        jumping = scratch.get("jumping", n, bool)
+
+        np.logical_and(archetype["awake"], jumping_now, out=jumping)
+        np.add(timer, dt, out=timer, where=jumping)
+        np.multiply(timer, np.pi, out=work)
+        np.sin(work, out=work)
+        work *= archetype.traits["max_jump_height"]
+        np.copyto(height, work, casting="unsafe", where=jumping)
+        np.greater_equal(timer, 1.0, out=mask)
+        mask &= jumping  # Landed
+        np.copyto(jumping_now, False, where=mask)
+        np.copyto(height, 0, where=mask)
+
+
+def movement_system(world, dt, collidable, archetypes=None):
+    """Move awake entities along their move direction at their speed, sliding along obstacles
+
+    The collision box is the body trait, (offset_x, offset_y, size) in tiles
+    from pos. Steps shorter than a tile are swept all at once; longer ones,
+    and the few boxes of small archetypes like the player's, one entity at a
+    time, so nothing tunnels through walls at any speed.
+    """
+    for archetype in archetypes or world.query("pos", "move", "speed", "awake"):
+        n = archetype.count
+        if not n:
+            continue
+        move = archetype["move"]
+        rows = pack(moving_mask(archetype, scratch.get("moving", n, bool)), "rows")
+        count = len(rows)
+        if not count:
+            continue
+
+        pos = archetype["pos"]
+        step_x, step_y = gather(move, rows, "step")
+        steps = scratch.get("steps", count)
+        np.take(archetype["speed"], rows, out=steps, mode="clip")
+        steps *= dt
+        step_x *= steps
+        step_y *= steps
+        xs, ys = gather(pos, rows, "pos")
+        offset_x, offset_y, size = archetype.traits["body"]
+        left = scratch.get("left", count)
+        top = scratch.get("top", count)
+        np.add(xs, offset_x, out=left)
+        np.add(ys, offset_y, out=top)
+
+        moved_x = scratch.get("moved_x", count)
+        moved_y = scratch.get("moved_y", count)
+        if count > SCALAR_SWEEP_MAX and steps.max() < 1.0:
+            sweep_boxes_short(collidable, left, top, size, size, step_x, step_y, moved_x, moved_y)
+        else:
+            for i, (x, y, dx, dy) in enumerate(zip(left.tolist(), top.tolist(), step_x.tolist(), step_y.tolist())):
+                moved_x[i], moved_y[i] = sweep_box(collidable, x, y, size, size, dx, dy)
+        xs += moved_x
+        ys += moved_y
+        scatter(pos, rows, xs, ys)
+
+
+def animation_system(world, dt, archetypes=None):
+    """Pick each entity's frame from the frames trait of its archetype
+
+    Jumping entities show the jump frame for how far into the jump they
+    are; the rest show their walk cycle, which only advances while they
+    move. The pose is the pose column, or else the facing direction (right,
+    then left).
+    """
+    for archetype in archetypes or world.query("frame", "anim_time", "move", "awake", "jumping", "jump_timer"):
+        n = archetype.count
+        if not n:
+            continue
+        table = archetype.traits["frames"]
+        anim_time = archetype["anim_time"]
+        work = scratch.get("work", n)
+        frames = scratch.get("frames", n)
+        mask = scratch.get("mask", n, bool)
+
+        # Walk cycle, from the start whenever an entity stands still
+        walking = moving_mask(archetype, scratch.get("moving", n, bool))
+        np.add(anim_time, dt, out=anim_time, where=walking)
+        np.logical_not(walking, out=mask)
+        np.copyto(anim_time, 0, where=mask)
+        np.multiply(anim_time, WALK_FPS, out=frames)
+        np.floor(frames, out=frames)
+        np.mod(frames, table.walk_frames, out=frames)
+
+        # Jump frames follow the jump timer over its second
+        np.multiply(archetype["jump_timer"], table.jump_frames, out=work)
+        np.floor(work, out=work)
+        np.minimum(work, table.jump_frames - 1, out=work)
+        work += table.walk_frames
+        np.copyto(frames, work, where=archetype["jumping"])
+
+        if "pose" in archetype.columns:
+            np.copyto(work, archetype["pose"])
+        else:
+            np.logical_not(archetype["facing_right"], out=mask)
+            np.copyto(work, mask)
+        work *= table.stride
+        frames += work
+        np.copyto(archetype["frame"], frames, casting="unsafe")
+
+
+def stomp_system(world):
+    """Remove the stompable entities that jumping stompers land on, scoring their points trait
+
+    Entities overlap when their positions are less than a tile apart along
+    both axes. The removed entities' stomp_sounds are raised for the sound
+    system. Returns the ids of the entities removed.
+    """
+    removed = []
+    for stompers in world.query("pos", "jumping", "stomper"):
+        if not stompers["jumping"].any():
+            continue
+        for row in np.flatnonzero(stompers["jumping"]).tolist():
+            x, y = stompers["pos"][row]
+            for targets in world.query("pos", "stompable"):
+                if not targets.count:
+                    continue
+                hit = within(targets, x, y, 1.0, scratch.get("hit", targets.count, bool))
+                if not hit.any():
+                    continue
+                traits = targets.traits
+                for entity in targets.entities[:targets.count][hit].tolist():
+                    world.points += traits.get("points", 1)
+                    world.sounds.extend(traits.get("stomp_sounds", ()))
+                    world.despawn(entity)
+                    removed.append(entity)
+    return removed
+
+
+def sound_system(world, listener, archetypes=None):
+    """Play the jump sounds of entities that took off this tick, then the sounds other systems raised
+
+    An archetype's jump_sound trait is a (sound, volume) pair. With a
+    sound_range trait, only the jumps that close to the listener along both
+    axes are heard, as one sound at the distance of the nearest.
+    """
+    listener_x, listener_y = listener
+    for archetype in archetypes or world.query("pos", "jump_started"):
+        jump_sound = archetype.traits.get("jump_sound")
+        started = archetype["jump_started"]
+        if jump_sound is None or not started.any():
+            continue
+        sound, volume = jump_sound
+        hearing = archetype.traits.get("sound_range")
+        if hearing is None:
+            play_sound(sound, settings.SFX_VOLUME * volume)
+            continue
+
+        n = archetype.count
+        heard = within(archetype, listener_x, listener_y, hearing, scratch.get("heard", n, bool))
+        heard &= started
+        if heard.any():
+            offset = scratch.get("offset", n, columns=2)  # Left absolute by within
+            distance = scratch.get("distance", n)
+            np.hypot(offset[:, 0], offset[:, 1], out=distance)
+            play_sound(sound, settings.SFX_VOLUME * volume, distance.min(where=heard, initial=np.inf))
+
+    for sound, volume in world.sounds:
+        play_sound(sound, settings.SFX_VOLUME * volume)
+    world.sounds.clear()
+
+
+def screen_positions(archetype, camera_offset, alpha):
+    """Get where an archetype's entities are on the screen, interpolated between ticks by alpha
+
+    Returns x, y lifted by the jump height, and the y of the ground under
+    them, rounded to whole pixels.
+    """
+    n = archetype.count
+    pos = archetype["pos"]
+    prev_pos = archetype["prev_pos"]
+    xs = scratch.get("screen_x", n)
+    ground = scratch.get("screen_ground", n)
+    for column, out, camera in ((0, xs, camera_offset[0]), (1, ground, camera_offset[1])):
+        np.subtract(pos[:, column], prev_pos[:, column], out=out)
+        out *= alpha
+        out += prev_pos[:, column]
+        out *= TILE_SIZE
+        out -= camera
+        np.rint(out, out=out)
+    ys = scratch.get("screen_y", n)
+    np.copyto(ys, archetype["jump_height"])  # Subtracting the ints directly would buffer their conversion
+    np.subtract(ground, ys, out=ys)
+    return xs, ys, ground
+
+
+def sprite_batch(world, screen, camera_offset, alpha):
+    """Gather the sprites near the screen, ordered by layer trait then ground y, as (surface, position) blits
+
+    Sprites are ordered by the bottom of their body, so those further down
+    the screen overlap those behind them. Everything up to the final order
+    is worked out with array operations; drawing a sprite costs the same
+    whichever frame it shows.
+    """
+    archetypes = world.query("pos", "prev_pos", "jump_height", "frame")
+    total = 0
+    for archetype in archetypes:
+        total += archetype.count
+    keys = scratch.get("draw_keys", total)
+    draw_x = scratch.get("draw_x", total)
+    draw_y = scratch.get("draw_y", total)
+    surfaces = scratch.get("draw_surfaces", total, object)
+    width, height = screen.get_size()
+    count = 0
+
+    for archetype in archetypes:
+        n = archetype.count
+        if not n:
+            continue
+        traits = archetype.traits
+        table = traits["frames"]
+        xs, ys, ground = screen_positions(archetype, camera_offset, alpha)
+        visible = scratch.get("visible", n, bool)
+        mask = scratch.get("mask", n, bool)
+        np.greater_equal(xs, -DRAW_MARGIN, out=visible)
+        np.less_equal(xs, width + DRAW_MARGIN, out=mask)
+        visible &= mask
+        np.greater_equal(ys, -DRAW_MARGIN, out=mask)
+        visible &= mask
+        np.less_equal(ys, height + DRAW_MARGIN, out=mask)
+        visible &= mask
+        rows = pack(visible, "visible_rows")
+        end = count + len(rows)
+
+        frames = scratch.get("draw_frames", len(rows), np.int64)
+        offsets = scratch.get("draw_offsets", len(rows))
+        np.take(archetype["frame"], rows, out=frames, mode="clip")
+        np.take(table.surfaces, frames, out=surfaces[count:end], mode="clip")
+        np.take(xs, rows, out=draw_x[count:end], mode="clip")
+        np.take(table.offset_x, frames, out=offsets, mode="clip")
+        draw_x[count:end] += offsets
+        np.take(ys, rows, out=draw_y[count:end], mode="clip")
+        np.take(table.offset_y, frames, out=offsets, mode="clip")
+        draw_y[count:end] += offsets
+
+        # Bottom of the body on screen, under the layer above
+        offset_y, size = traits["body"][1:]
+        np.take(ground, rows, out=keys[count:end], mode="clip")
+        keys[count:end] += (offset_y + size) * TILE_SIZE + traits.get("layer", 0) * LAYER_SPAN
+        count = end
+
+    order = np.argsort(keys[:count], kind="stable")
+    return zip(surfaces[:count][order].tolist(),
+               zip(draw_x[:count][order].tolist(), draw_y[:count][order].tolist()))
+
+
+def render_system(world, screen, camera_offset, alpha=1.0, return_rects=True):
+    """Draw every entity on screen with a single blits call
+
+    Returns the screen rects drawn, unless return_rects is False.
+    """
+    return screen.blits(sprite_batch(world, screen, camera_offset, alpha), return_rects)
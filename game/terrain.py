@@ -0,0 +1,127 @@
+import pygame
+import settings
+from settings import TILE_SIZE
+
+
+class TerrainRenderer:
+    """Draw the map from cached, pre-rendered chunks of tiles"""
+
+    def __init__(self, game_map, chunk_size=None, budget_mb=None):
+        self.game_map = game_map
+        self.chunk_size = chunk_size or settings.CHUNK_SIZE
+        budget_mb = settings.CHUNK_CACHE_BUDGET_MB if budget_mb is None else budget_mb
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+
+        # (chunk_x, chunk_y) -> pre-rendered surface
+        self.chunks = {}
+        self.used_bytes = 0
+        self.textures = None
+
+    def chunk_of(self, x, y):
+        """Get the chunk coordinates containing a tile"""
+        return x // self.chunk_size, y // self.chunk_size
+
+    def invalidate_tile(self, x, y):
+        """Drop the cached chunk containing a tile so it is rebuilt on next draw"""
+        self.drop_chunk(self.chunk_of(x, y))
+
+    def invalidate_all(self):
+        """Drop every cached chunk"""
+        self.chunks.clear()
+        self.used_bytes = 0
+
+    def drop_chunk(self, key):
+        surface = self.chunks.pop(key, None)
+        if surface is not None:
+            self.used_bytes -= self.surface_bytes(surface)
+
+    def surface_bytes(self, surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def build_chunk(self, chunk_x, chunk_y, textures):
+        """Render one chunk of tiles into its own surface"""
+        data = self.game_map.data
+        map_height, map_width = data.shape
+
+        start_x = chunk_x * self.chunk_size
+        start_y = chunk_y * self.chunk_size
+        end_x = min(map_width, start_x + self.chunk_size)
+        end_y = min(map_height, start_y + self.chunk_size)
+
+        size = ((end_x - start_x) * TILE_SIZE, (end_y - start_y) * TILE_SIZE)
+        surface = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+
+        # Get fallback texture
+        fallback_texture = textures.get('fallback') or textures.get(1) or next(iter(textures.values()))
+        tile_mapping = textures['tile_mapping']
+
+        # Compose every tile of the chunk in a single blits call
+        blit_list = []
+        for y in range(start_y, end_y):
+            row = data[y, start_x:end_x].tolist()
+            screen_y = (y - start_y) * TILE_SIZE
+            for x, tile_id in enumerate(row):
+                texture = tile_mapping.get(tile_id)
+                if texture is None:
+                    texture = fallback_texture
+                blit_list.append((texture, (x * TILE_SIZE, screen_y)))
+        surface.blits(blit_list, False)
+
+        self.chunks[(chunk_x, chunk_y)] = surface
+        self.used_bytes += self.surface_bytes(surface)
+        return surface
+
+    def evict(self, visible, center):
+        """Evict the chunks furthest from the camera until the cache fits its budget"""
+        if self.used_bytes <= self.budget_bytes:
+            return
+
+        center_x, center_y = center
+        candidates = [key for key in self.chunks if key not in visible]
+        candidates.sort(key=lambda key: (key[0] - center_x) ** 2 + (key[1] - center_y) ** 2, reverse=True)
+
+        for key in candidates:
+            if self.used_bytes <= self.budget_bytes:
+                break
+            self.drop_chunk(key)
+
+    def draw(self, screen, textures, camera_pos):
+        """Blit the chunks overlapping the view, building missing ones on demand"""
+        # Chunks are rendered from a specific texture set
+        if textures is not self.textures:
+            self.invalidate_all()
+            self.textures = textures
+
+        map_height, map_width = self.game_map.data.shape
+        if not map_width or not map_height:
+            return
+
+        screen_width, screen_height = screen.get_width(), screen.get_height()
+        chunk_pixels = self.chunk_size * TILE_SIZE
+        last_chunk_x = (map_width - 1) // self.chunk_size
+        last_chunk_y = (map_height - 1) // self.chunk_size
+
+        # Determine which chunks are visible based on camera position
+        start_cx = max(0, int(camera_pos.x // chunk_pixels))
+        start_cy = max(0, int(camera_pos.y // chunk_pixels))
+        end_cx = min(last_chunk_x, int((camera_pos.x + screen_width) // chunk_pixels))
+        end_cy = min(last_chunk_y, int((camera_pos.y + screen_height) // chunk_pixels))
+
+        visible = set()
+        blit_list = []
+        for chunk_y in range(start_cy, end_cy + 1):
+            for chunk_x in range(start_cx, end_cx + 1):
+                key = (chunk_x, chunk_y)
+                visible.add(key)
+                surface = self.chunks.get(key)
+                if surface is None:
+                    surface = self.build_chunk(chunk_x, chunk_y, textures)
+                blit_list.append((surface, (chunk_x * chunk_pixels - camera_pos.x,
+                                            chunk_y * chunk_pixels - camera_pos.y)))
+        screen.blits(blit_list, False)
+
+        center = ((camera_pos.x + screen_width / 2) // chunk_pixels,
+                  (camera_pos.y + screen_height / 2) // chunk_pixels)
+        self.evict(visible, center)
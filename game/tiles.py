@@ -0,0 +1,170 @@
+import os
+import json
+import numpy as np
+import pygame
+
+FILLER_TILE = 1  # Grass, used to pad short rows
+BORDER_TILE = 9  # Bedrock
+LUT_SIZE = 65536  # Covers every id a uint16 grid can hold
+
+# Tile categories, stored per cell in Map.category
+TILE_FLOOR = 0
+TILE_SOLID = 1
+TILE_SPAWN = 2
+TILE_TELEPORT_NEXT = 3
+TILE_TELEPORT_PREV = 4
+
+TILE_CATEGORIES = {
+    "spawn": TILE_SPAWN,
+    "teleport_next": TILE_TELEPORT_NEXT,
+    "teleport_prev": TILE_TELEPORT_PREV,
+}
+
+
+def tile_dtype(values):
+    """Get the smallest unsigned dtype able to hold every tile id in values"""
+    if values.size and values.max() > 255:
+        return np.uint16
+    return np.uint8
+
+
+def build_tile_luts(tile_info):
+    """Build tile id -> collidable and tile id -> category lookup arrays"""
+    collidable_lut = np.zeros(LUT_SIZE, dtype=bool)
+    category_lut = np.full(LUT_SIZE, TILE_FLOOR, dtype=np.uint8)
+
+    for tile_str_id, info in tile_info.items():
+        try:
+            tile_id = int(tile_str_id)
+        except ValueError:
+            continue
+        if not 0 <= tile_id < LUT_SIZE:
+            continue
+        collidable_lut[tile_id] = info.get("collidable", False)
+        category_lut[tile_id] = TILE_CATEGORIES.get(
+            info.get("name"), TILE_SOLID if collidable_lut[tile_id] else TILE_FLOOR)
+
+    return collidable_lut, category_lut
+
+
+DEFAULT_TILE_COLOR = (128, 128, 128)  # Minimap colour for tiles without a "color" entry
+
+
+def build_color_lut(tile_info):
+    """Build a tile id -> RGB minimap colour lookup array from the tiles' "color" entries"""
+    color_lut = np.empty((LUT_SIZE, 3), dtype=np.uint8)
+    color_lut[:] = DEFAULT_TILE_COLOR
+
+    for tile_str_id, info in tile_info.items():
+        try:
+            tile_id = int(tile_str_id)
+            color = pygame.Color(info["color"])
+        except (ValueError, KeyError):
+            continue
+        if 0 <= tile_id < LUT_SIZE:
+            color_lut[tile_id] = (color.r, color.g, color.b)
+
+    return color_lut
+
+
+class TileRegistry:
+    """Read-only view of the tile table in mapdata.json as dense id-indexed arrays
+
+    Parsed once and shared by collision, maps, texture loading and the UI.
+    A reload builds a new registry rather than changing this one.
+    """
+
+    def __init__(self, tile_info, stamp=None):
+        self.tile_info = tile_info  # str id -> tile entry, as in the file
+        self.stamp = stamp  # (mtime_ns, size) of the file it was read from
+        self.ids = sorted(tile_id for tile_id in map(parse_tile_id, tile_info) if tile_id is not None)
+
+        self.collidable, self.category = build_tile_luts(tile_info)
+        self.colors = build_color_lut(tile_info)
+        for lut in (self.collidable, self.category, self.colors):
+            lut.flags.writeable = False
+
+        # Dense up to the highest id; ids past it are unknown
+        size = self.ids[-1] + 1 if self.ids else 0
+        self.names = ["Unknown"] * size
+        self.textures = [None] * size  # Texture file names
+        for tile_str_id, info in tile_info.items():
+            tile_id = parse_tile_id(tile_str_id)
+            if tile_id is not None and tile_id < size:
+                self.names[tile_id] = info.get("name", "Unknown")
+                self.textures[tile_id] = info.get("texture")
+
+    @classmethod
+    def read(cls, path):
+        """Parse the tile table from a file, raising OSError or ValueError if it is missing or invalid"""
+        stat = os.stat(path)
+        with open(path, 'r') as f:
+            data = json.load(f)
+        tile_info = data.get("tiles", {}) if isinstance(data, dict) else None
+        if not isinstance(tile_info, dict) or not all(isinstance(info, dict) for info in tile_info.values()):
+            raise ValueError("expected an object of tiles, each an object")
+        return cls(tile_info, (stat.st_mtime_ns, stat.st_size))
+
+    @classmethod
+    def load(cls, path):
+        """Parse the tile table from a file, empty if it is missing or invalid"""
+        try:
+            return cls.read(path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading {path}: {e}")
+            return cls({})
+
+    def name(self, tile_id):
+        return self.names[tile_id] if 0 <= tile_id < len(self.names) else "Unknown"
+
+    def is_collidable(self, tile_id):
+        return bool(self.collidable[tile_id]) if 0 <= tile_id < LUT_SIZE else False
+
+
+def parse_tile_id(tile_str_id):
+    try:
+        tile_id = int(tile_str_id)
+    except ValueError:
+        return None
+    return tile_id if 0 <= tile_id < LUT_SIZE else None
+
+
+TILE_DATA_PATH = "./mapdata.json"
+_registry = None
+_rejected_stamp = None  # Stamp of the last mapdata.json that failed to parse on a reload
+
+
+def tile_registry():
+    """Get the current tile registry, loading it on first use"""
+    global _registry
+    if _registry is None:
+        _registry = TileRegistry.load(TILE_DATA_PATH)
+    return _registry
+
+
+def reload_tile_registry():
+    """Reload the registry if mapdata.json changed on disk; returns whether it did
+
+    A file that is missing, fails to parse (e.g. half-saved) or is not
+    shaped like a tile table leaves the
+    current registry in place, and is not read again until it changes.
+    """
+    global _registry, _rejected_stamp
+    if _registry is None:
+        tile_registry()
+        return True
+    try:
+        stat = os.stat(TILE_DATA_PATH)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+    if stamp == _registry.stamp or stamp == _rejected_stamp:
+        return False
+    try:
+        _registry = TileRegistry.read(TILE_DATA_PATH)
+    except (OSError, ValueError) as e:
+        print(f"Keeping the current tiles, error loading {TILE_DATA_PATH}: {e}")
+        _rejected_stamp = stamp
+        return False
+    _rejected_stamp = None
+    return True
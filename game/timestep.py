@@ -0,0 +1,23 @@
+import settings
+
+
+class FixedTimestep:
+    """Accumulate real frame time and hand it out as fixed simulation ticks"""
+
+    def __init__(self, tick_rate=None, max_frame_time=None):
+        self.dt = 1.0 / (tick_rate or settings.SIM_TICK_RATE)
+        # Frames longer than this are clamped so a stall cannot trigger a burst of catch-up ticks
+        self.max_frame_time = max_frame_time or settings.MAX_FRAME_TIME
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """Add a frame's elapsed seconds and return how many ticks to simulate"""
+        self.accumulator += min(frame_time, self.max_frame_time)
+        ticks = int(self.accumulator / self.dt)
+        self.accumulator -= ticks * self.dt
+        return ticks
+
+    @property
+    def alpha(self):
+        """How far (0..1) rendering is between the last tick and the next"""
+        return min(self.accumulator / self.dt, 1.0)
@@ -1,78 +1,112 @@
 import pygame
 import settings
+from game.minimap import Minimap
+from utils.text_cache import text_cache
 
-def draw_ui(screen, player, game_map):
-    """Draw the user interface elements"""
-    # Draw sprint bar
+WHITE = (255, 255, 255)
+
+
+class HUD:
+    """Bottom-left HUD panel, re-composed only when something it shows changes"""
+
+    width = 400
+    height = 110
+    bar_x = 15
+    bar_y = 75  # Within the panel
     bar_width = 200
     bar_height = 20
-    bar_x = 15
-    bar_y = screen.get_height() - bar_height - 15
-    
-    pygame.draw.rect(screen, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
-    
-    energy_width = int((player.sprint_energy / 100.0) * bar_width)
-    
-    if player.sprint_cooldown > 0:
-        energy_color = (255, 0, 0)
-    elif player.sprinting:
-        energy_color = (255, 255, 0)
-    else:
-        energy_color = (0, 255, 0)
+
+    def __init__(self):
+        self.surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        self.state = None
+
+    def capture(self, player, game_map):
+        """Everything the panel shows, at the precision it shows it"""
+        energy_width = int((player.sprint_energy / 100.0) * self.bar_width)
         
-    pygame.draw.rect(screen, energy_color, (bar_x, bar_y, energy_width, bar_height))
-    pygame.draw.rect(screen, (200, 200, 200), (bar_x, bar_y, bar_width, bar_height), 2)
-    
-    label = settings.font.render("Sprint Energy: ", True, (255, 255, 255))
-    screen.blit(label, (bar_x, bar_y - 25))
-    
-    if player.sprint_cooldown > 0:
-        cooldown_text = settings.font.render(f"Cooldown: {player.sprint_cooldown:.1f}s", True, (255, 200, 200))
-        screen.blit(cooldown_text, (bar_x + bar_width + 10, bar_y))
-    
-    
-    # Display current map
-    map_text = settings.font.render(f"Map: {game_map.map_number}", True, (255, 255, 255))
-    screen.blit(map_text, (15, bar_y - 75))
+        if player.sprint_cooldown > 0:
+            energy_color = (255, 0, 0)
+            cooldown = f"{player.sprint_cooldown:.1f}s"
+        elif player.sprinting:
+            energy_color = (255, 255, 0)
+            cooldown = None
+        else:
+            energy_color = (0, 255, 0)
+            cooldown = None
+        return energy_width, energy_color, cooldown, game_map.map_number, player.world.points
+
+    def compose(self, state):
+        energy_width, energy_color, cooldown, map_number, points = state
+        surface = self.surface
+        surface.fill((0, 0, 0, 0))
+        bar_x, bar_y = self.bar_x, self.bar_y
+        
+        # Draw sprint bar
+        pygame.draw.rect(surface, (50, 50, 50), (bar_x, bar_y, self.bar_width, self.bar_height))
+        pygame.draw.rect(surface, energy_color, (bar_x, bar_y, energy_width, self.bar_height))
+        pygame.draw.rect(surface, (200, 200, 200), (bar_x, bar_y, self.bar_width, self.bar_height), 2)
+        
+        surface.blit(text_cache.render("Sprint Energy: ", WHITE), (bar_x, bar_y - 25))
+        
+        if cooldown:
+            text_cache.draw(surface, "Cooldown: ", cooldown, (255, 200, 200), (bar_x + self.bar_width + 10, bar_y))
+        
+        # Display current map and points counter
+        text_cache.draw(surface, "Map: ", str(map_number), WHITE, (15, bar_y - 75))
+        text_cache.draw(surface, "Points: ", str(points), WHITE, (15, bar_y - 50))
+
+    def draw(self, screen, player, game_map):
+        """Blit the panel, re-composing it first if its inputs changed; returns whether it did"""
+        state = self.capture(player, game_map)
+        changed = state != self.state
+        if changed:
+            self.compose(state)
+            self.state = state
+        screen.blit(self.surface, self.rect(screen))
+        return changed
+
+    def rect(self, screen):
+        return pygame.Rect(0, screen.get_height() - self.height, self.width, self.height)
+
+
+hud = HUD()
+minimap = Minimap()
+
+def draw_ui(screen, player, game_map):
+    """Draw the user interface elements, returning the screen rects drawn"""
+    hud.draw(screen, player, game_map)
+    rects = [hud.rect(screen)]
     
     current_block = player.get_current_block()
     if current_block and current_block['tile_name'] == 'teleport_next':
-        # Calculate required points based on current map
-        map_number = game_map.map_number
-        required_points = (map_number + 1) * 5  # 5 points for map 0, 10 for map 1, etc.
+        required_points = game_map.required_points
         
         if player.teleporting:
-            countdown_text = settings.font.render(f"Teleporting", True, (100, 255, 100))
+            countdown_text = text_cache.render("Teleporting", (100, 255, 100))
             countdown_rect = countdown_text.get_rect(center=(screen.get_width() // 2, countdown_text.get_height() // 2 + 15))
-            screen.blit(countdown_text, countdown_rect)
-        elif settings.POINTS < required_points:
-            required_text = settings.font.render(f"Need {required_points} points to teleport", True, (255, 200, 100))
+            rects.append(screen.blit(countdown_text, countdown_rect))
+        elif player.world.points < required_points:
+            required_text = text_cache.render(f"Need {required_points} points to teleport", (255, 200, 100))
             required_rect = required_text.get_rect(center=(screen.get_width() // 2, required_text.get_height() // 2 + 15))
-            screen.blit(required_text, required_rect)
+            rects.append(screen.blit(required_text, required_rect))
+    return rects
 
-    # Draw points counter
-    points_text = settings.font.render(f"Points: {settings.POINTS}", True, (255, 255, 255))
-    screen.blit(points_text, (15, bar_y - 50))
-    # screen.blit(points_text, (15, bar_y - 100))
-
-def draw_debug_info(screen, player, show_ui, npcs):
-    """Draw debug information when UI is enabled"""
+def draw_debug_info(screen, player, show_ui, npc_index, profiler=None):
+    """Draw debug information when UI is enabled, returning the screen rects drawn"""
     if not show_ui:
-        return
+        return []
         
     # === fps info
-    fps_text = settings.font.render(f"FPS: {int(settings.clock.get_fps())}", True, (255, 255, 255))
-    screen.blit(fps_text, (15, 15))
+    rects = [text_cache.draw(screen, "FPS: ", str(int(settings.clock.get_fps())), WHITE, (15, 15))]
 
     # === position info
-    pos_text = settings.font.render(f"Pos: ({player.pos.x:.0f}, {player.pos.y:.0f})", True, (255, 255, 255))
-    screen.blit(pos_text, (15, 35))
+    rects.append(text_cache.draw(screen, "Pos: ", f"({player.pos.x:.0f}, {player.pos.y:.0f})", WHITE, (15, 35)))
 
     # === block and tile info
     current_block = player.get_current_block()
     if current_block:
-        block_text = settings.font.render(f"Block: {current_block['tile_name']} ({current_block['block_x']}, {current_block['block_y']})", True, (255, 255, 255))
-        screen.blit(block_text, (15, 55))
+        rects.append(text_cache.draw(screen, f"Block: {current_block['tile_name']} ",
+                                     f"({current_block['block_x']}, {current_block['block_y']})", WHITE, (15, 55)))
         
     # === status info
     status_list = []
@@ -80,31 +114,49 @@ def draw_debug_info(screen, player, show_ui, npcs):
         status_list.append("Jumping")
     if player.sprinting:
         status_list.append("Sprinting")
-    status_text = settings.font.render(f"Status: {', '.join(status_list)}", True, (255, 255, 255))
-    screen.blit(status_text, (15, 75))
+    status_text = text_cache.render(f"Status: {', '.join(status_list)}", WHITE)
+    rects.append(screen.blit(status_text, (15, 75)))
     
-    draw_minimap(screen, player, npcs)
-
-def draw_minimap(screen, player, npcs):
-    """Draw the minimap in the corner of the screen"""
-    mini_map_size = 100
-    mini_map_surface = pygame.Surface((mini_map_size, mini_map_size))
-    mini_map_surface.fill("#d97757")
-    pygame.draw.rect(screen, (200, 200, 200), (screen.get_width() - mini_map_size - 23, 16.8, 106, 107))
+    rects.extend(draw_minimap(screen, player, npc_index))
+    if profiler is not None and profiler.enabled:
+        rects.extend(draw_profiler(screen, profiler, (15, 100)))
+    return rects
+
+def draw_profiler(screen, profiler, origin):
+    """Draw a frame-time graph and the per-phase breakdown, returning the screen rects drawn"""
+    graph_width = profiler.history
+    graph_height = 60
+    x, y = origin
     
-    # Draw player on minimap
-    player_mini_x = (player.pos.x / settings.MAP_WIDTH) * mini_map_size
-    player_mini_y = (player.pos.y / settings.MAP_HEIGHT) * mini_map_size
-    pygame.draw.circle(mini_map_surface, ("#e83b3b"), (player_mini_x, player_mini_y), 3)
-
-    # Draw only nearby NPCs on minimap 
-    for npc in npcs:
-        # Only draw NPCs that are relatively close to player
-        dx = abs(npc.pos.x - player.pos.x)
-        dy = abs(npc.pos.y - player.pos.y)
-        if dx < 20 and dy < 20:
-            npc_mini_x = (npc.pos.x / settings.MAP_WIDTH) * mini_map_size
-            npc_mini_y = (npc.pos.y / settings.MAP_HEIGHT) * mini_map_size
-            pygame.draw.circle(mini_map_surface, ("#03ff00"), (npc_mini_x, npc_mini_y), 2)
+    graph = pygame.Surface((graph_width, graph_height), pygame.SRCALPHA)
+    graph.fill((0, 0, 0, 140))
     
-    screen.blit(mini_map_surface, (screen.get_width() - mini_map_size - 20, 20))
\ No newline at end of file
+    # One bar per frame, full height is 2 frames at 60 FPS
+    scale = graph_height / 33.3
+    for i, frame_ms in enumerate(profiler.frame_times):
+        bar_height = min(graph_height, frame_ms * scale)
+        color = (0, 255, 0) if frame_ms <= 16.7 else (255, 200, 0) if frame_ms <= 33.3 else (255, 0, 0)
+        pygame.draw.line(graph, color, (i, graph_height - 1), (i, graph_height - bar_height))
+    
+    # 60 FPS budget line
+    budget_y = graph_height - 16.7 * scale
+    pygame.draw.line(graph, (255, 255, 255), (0, budget_y), (graph_width, budget_y))
+    rects = [screen.blit(graph, (x, y))]
+    
+    # Per-phase breakdown, slowest first
+    stats = [(name, *profiler.phase_stats(name)) for name in profiler.phases]
+    stats.sort(key=lambda item: item[1], reverse=True)
+    line_y = y + graph_height + 5
+    for name, average, (p50, p95, p99), maximum in stats:
+        rects.append(text_cache.draw(screen, f"{name}: ",
+                                     f"{average:.2f} ms (p50 {p50:.2f}, p95 {p95:.2f}, p99 {p99:.2f}, max {maximum:.2f})",
+                                     WHITE, (x, line_y)))
+        line_y += 20
+    return rects
+
+def draw_minimap(screen, player, npc_index):
+    """Draw the minimap in the corner of the screen, returning the screen rects drawn"""
+    mini_map_size = minimap.size
+    frame_rect = pygame.draw.rect(screen, (200, 200, 200), (screen.get_width() - mini_map_size - 23, 16.8, 106, 107))
+    minimap.draw(screen, player, npc_index, (screen.get_width() - mini_map_size - 20, 20))
+    return [frame_rect]
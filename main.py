@@ -1,133 +1,117 @@
 import pygame
 import settings
 import os
+import time
 from utils.texture_loader import load_textures
-from game.map import Map
 from game.camera import Camera
-from game.ui import draw_ui, draw_debug_info
-from game.collision import process_npc_collisions
-from entities.player import Player
-from entities.npc import create_npcs, NPC
-from utils.sound_manager import play_bgm, GameSounds, play_sound
+from game.ui import draw_ui, draw_debug_info, minimap
+from game.simulation import Simulation
+from game.timestep import FixedTimestep
+from game.replay import ReplayRecorder
+from game.tiles import reload_tile_registry
+from game.renderer import DirtyRectRenderer
+from game.systems import render_system
+from utils.sound_manager import play_bgm, GameSounds, play_sound, audio_assets, SOUND_EFFECTS
+from utils.profiler import profiler
 
 def main():
     # Initialize game
     running = True
     show_ui = False
-    dt = 0
+    frame_time = 0
     
+    # Decode sounds in the background while textures and the first map load
+    if settings.SOUND_ENABLED:
+        audio_assets.preload(SOUND_EFFECTS)
+        play_bgm(GameSounds.MAIN_THEME, settings.MUSIC_VOLUME)
+
     # Load textures
     textures = load_textures()
 
+    # Load the first map with its player and NPCs
+    sim = Simulation(textures, seed=settings.SEED)
+    if settings.RECORD_REPLAY:
+        sim.recorder = ReplayRecorder(settings.RECORD_REPLAY, sim.seed, sim.map_path, sim.points, sim.tick_rate)
+
     if settings.SOUND_ENABLED:
-        play_bgm(GameSounds.MAIN_THEME, settings.MUSIC_VOLUME)
+        audio_assets.wait([GameSounds.GAME_START], timeout=1.0)
         play_sound(GameSounds.GAME_START, settings.SFX_VOLUME)
-
-    # Load map
-    game_map = Map("./maps/map000.txt")
-    # teleport_points_required = 5
-    
-    # Create player at spawn location
-    player_pos = game_map.find_spawn_location()
-    player = Player(player_pos, textures, game_map)
+    timestep = FixedTimestep()
     
     # Create camera
     camera = Camera()
-    
-    # Create initial NPCs
-    npcs = create_npcs(game_map.data, 5, textures)
+    view_pos = pygame.Vector2()  # Player position the camera follows, reused every frame
+    renderer = DirtyRectRenderer(settings.DIRTY_RECTS)
+    last_reload_check = time.perf_counter()
     
     # Game loop
     while running:
+        profiler.begin_frame()
+
         # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_i:
-                    show_ui = not show_ui
-                if event.key == pygame.K_ESCAPE:
+        with profiler.scope("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
                     running = False
-    
-        settings.screen.fill("#625465")
-        keys = pygame.key.get_pressed()
-    
-        # Update player
-        player.update(dt, keys, game_map.data)
-
-        # Update player
-        teleport_direction = player.update(dt, keys, game_map.data)
-        player.check_teleportation(game_map.data)
-
-       # Check if teleportation is complete
-        if teleport_direction:
-            if teleport_direction == "next":
-                next_map_path = game_map.get_next_map_path()
-                if os.path.exists(next_map_path):
-                    game_map = Map(next_map_path)
-                    player.pos = game_map.find_spawn_location()
-                    player.game_map = game_map  # Update player's game_map reference
-                    player.teleporting = False  # Reset the teleporting state
-                    # Create new NPCs for the new map
-                    npcs = create_npcs(game_map.data, 5, textures)
-                    # Play level complete sound
-                    play_sound(GameSounds.LEVEL_COMPLETE, settings.SFX_VOLUME)
-            elif teleport_direction == "previous":
-                prev_map_path = game_map.get_previous_map_path()
-                if os.path.exists(prev_map_path):
-                    game_map = Map(prev_map_path)
-                    player.pos = game_map.find_spawn_location()
-                    player.game_map = game_map  # Update player's game_map reference
-                    player.teleporting = False  # Reset the teleporting state
-                    # Create new NPCs for the new map
-                    npcs = create_npcs(game_map.data, 5, textures)
-                    # Play level change sound
-                    play_sound(GameSounds.LEVEL_COMPLETE, settings.SFX_VOLUME * 0.7)
-
-        
-        # Update camera
-        camera.update(player.pos)
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_i:
+                        show_ui = not show_ui
+                        profiler.set_enabled(show_ui or settings.PROFILE)
+                    if show_ui and event.key in (pygame.K_EQUALS, pygame.K_PLUS):
+                        minimap.zoom_in()
+                    if show_ui and event.key == pygame.K_MINUS:
+                        minimap.zoom_out()
+                    if event.key == pygame.K_F9:
+                        trace_path = os.path.join(settings.PROFILE_TRACE_DIR, f'trace-{int(time.time())}.json')
+                        print(f"Trace written to {profiler.export_chrome_trace(trace_path)}")
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
         
-        # Only update NPCs that are close to the player for performance
-        for npc in npcs:
-            # Calculate distance to player
-            dx = abs(npc.pos.x - player.pos.x)
-            dy = abs(npc.pos.y - player.pos.y)
-            if dx < 20 and dy < 20:  # Only update NPCs within range
-                npc.update(dt, player, game_map.data)
+            keys = pygame.key.get_pressed()
+            audio_assets.collect()
     
-        # Process collisions
-        process_npc_collisions(player, npcs)
+        # Pick up edits to mapdata.json while playing
+        if time.perf_counter() - last_reload_check >= settings.TILE_RELOAD_INTERVAL:
+            last_reload_check = time.perf_counter()
+            if reload_tile_registry():
+                textures = load_textures()
+                sim.reload_tiles(textures)
     
-        # Respawn NPCs if needed
-        if len(npcs) < 5:
-            npcs.extend(create_npcs(game_map.data, 5 - len(npcs), textures))
-    
-        # Draw world
-        game_map.draw(settings.screen, textures, camera.position)
+        # Advance the simulation in fixed ticks, however long the last frame took
+        for _ in range(timestep.advance(frame_time)):
+            sim.step(keys)
+        alpha = timestep.alpha
+        player, game_map = sim.player, sim.game_map
         
-        # Draw NPCs (only those on screen)
-        screen_width, screen_height = settings.screen.get_width(), settings.screen.get_height()
-        for npc in npcs:
-            screen_x = npc.pos.x * settings.TILE_SIZE - camera.position.x
-            screen_y = npc.pos.y * settings.TILE_SIZE - camera.position.y
-            
-            # Only draw if within visible screen area (with buffer)
-            if (-settings.TILE_SIZE <= screen_x <= screen_width and 
-                -settings.TILE_SIZE <= screen_y <= screen_height):
-                npc.draw(settings.screen, camera.position)
+        # Update camera to the player's position interpolated between ticks
+        view_pos.x = player.prev_pos.x + (player.pos.x - player.prev_pos.x) * alpha
+        view_pos.y = player.prev_pos.y + (player.pos.y - player.prev_pos.y) * alpha
+        camera.update(view_pos)
     
-        # Draw player (always in center of screen)
-        player.draw(settings.screen)
+        # Draw world, only when the camera moved if the last frame can be patched up instead
+        with profiler.scope("map_draw"):
+            if renderer.begin(settings.screen, camera.position, game_map):
+                settings.screen.fill("#625465")
+                game_map.draw(settings.screen, textures, camera.position)
+                renderer.capture(settings.screen)
+        
+        # Draw the NPCs and the player on screen, in one batch
+        with profiler.scope("sprite_draw"):
+            renderer.mark(render_system(sim.world, settings.screen, camera.position, alpha, renderer.enabled))
         
         # Draw UI
-        draw_ui(settings.screen, player, game_map)
-        draw_debug_info(settings.screen, player, show_ui, npcs)
+        with profiler.scope("ui"):
+            renderer.mark(draw_ui(settings.screen, player, game_map))
+            renderer.mark(draw_debug_info(settings.screen, player, show_ui, sim.npc_index, profiler))
     
-        pygame.display.flip()
-        dt = min(settings.clock.tick(60) / 1000, 0.1)  # Cap dt to prevent physics issues
+        with profiler.scope("flip"):
+            renderer.present()
+        profiler.end_frame()
+        frame_time = settings.clock.tick(settings.FPS_LIMIT) / 1000
     
+    sim.shutdown()
+    audio_assets.shutdown()
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
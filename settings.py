@@ -1,3 +1,12 @@
+import os
+
+# Headless mode (RPGFORGE_HEADLESS=1): dummy video and audio drivers, no sound,
+# so the game can run on machines without a display or audio device
+HEADLESS = os.environ.get("RPGFORGE_HEADLESS") == "1"
+if HEADLESS:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
 import pygame
 
 # Game constants
@@ -6,18 +15,59 @@ WALK_SPEED = 10
 SPRINT_SPEED = 25
 SPRINT_COOLDOWN = 3.0
 
-# Map dimensions (will be updated when map is loaded)
-MAP_WIDTH = 0
-MAP_HEIGHT = 0
+# Simulation timing
+SIM_TICK_RATE = 60  # Fixed simulation ticks per second
+MAX_FRAME_TIME = 0.25  # Longest frame (seconds) the simulation will catch up on
+FPS_LIMIT = 60  # Render frame cap, 0 for uncapped
+
+# Rendering
+DIRTY_RECTS = os.environ.get("RPGFORGE_DIRTY_RECTS") == "1"  # Redraw only changed regions while the camera is still
+
+# Replays: RPGFORGE_RECORD=<file> records the session, RPGFORGE_SEED fixes the RNG seed
+RECORD_REPLAY = os.environ.get("RPGFORGE_RECORD")
+SEED = int(os.environ["RPGFORGE_SEED"]) if os.environ.get("RPGFORGE_SEED") else None
+
+# Profiling (always on with RPGFORGE_PROFILE=1, otherwise while the I overlay is shown)
+PROFILE = os.environ.get("RPGFORGE_PROFILE") == "1"
+PROFILE_HISTORY = 240  # Frames of per-phase history for the overlay graph
+PROFILE_TRACE_EVENTS = 50000  # Events kept for Chrome trace export (F9)
+PROFILE_TRACE_DIR = os.environ.get("RPGFORGE_TRACE_DIR", "./traces")  # Where F9 writes traces
+
+# Decoded and scaled texture pixels kept between launches, empty to disable
+TEXTURE_CACHE_DIR = os.environ.get("RPGFORGE_TEXTURE_CACHE", "./textures/cache")
+
+# Seconds between checks of mapdata.json for changes to reload
+TILE_RELOAD_INTERVAL = 1.0
+
+# Rendered text surfaces kept for the HUD and overlays
+TEXT_CACHE_SIZE = 256
+
+# Terrain chunk cache
+CHUNK_SIZE = 16  # Tiles per side of a pre-rendered chunk
+CHUNK_CACHE_BUDGET_MB = 96  # Chunks furthest from the camera are evicted above this
+
+# Map streaming
+LEVEL_CACHE_SIZE = 4  # Recently visited or prefetched levels kept in memory
+
+# NPC spatial index
+SPATIAL_CELL_SIZE = 4  # Tiles per side of a spatial hash cell
+
+# NPC pathfinding
+FLOW_FIELD_BUDGET = 0  # Cells expanded per frame when recomputing, 0 = all at once
+FLOW_FIELD_RADIUS = 32  # Tiles searched around the player, 0 = whole map
 
-# Global game state
-POINTS = 0
-REQUIRED_POINTS = 5
+# Scoring (the points themselves are kept by the simulation's World)
+POINTS = 0  # Points at the start of a session
+REQUIRED_POINTS = 5  # Per map number, to unlock the teleporters to the next map
 
 # Sound effects
-SOUND_ENABLED = True
+SOUND_ENABLED = not HEADLESS
 MUSIC_VOLUME = 0.3
 SFX_VOLUME = 0.5
+SOUND_CHANNELS = 16  # Mixer channels shared by all sound effects
+SOUND_HEARING_RANGE = 10  # Tiles from the player at which positional sounds fade out
+SOUND_CACHE_BUDGET_MB = 32  # Decoded sound effects kept in memory, least recently used dropped first
+AUDIO_LOAD_WORKERS = 2  # Threads decoding sounds in the background
 
 # Initialize pygame and create basic objects
 pygame.init()
@@ -0,0 +1,22 @@
+import numpy as np
+from game.flowfield import FlowField
+
+
+def test_budgeted_field_keeps_publishing_toward_a_moving_target():
+    # Open map, a field spread over many updates, and a target moving a tile faster than a window fills
+    field = FlowField(np.zeros((128, 128), dtype=bool), budget=300, radius=32)
+    target_x, target_y = 22, 60
+    published = []
+    for tick in range(600):
+        if tick and tick % 12 == 0:
+            target_x += 1
+        previous = field.target
+        field.update(target_x, target_y)
+        if field.target != previous:
+            published.append(field.target)
+
+    assert len(published) > 10
+    # A 65x65 window takes 15 updates at this budget, so the field trails the target by a tile or two
+    assert target_x - field.target[0] <= 2
+    assert field.target[1] == target_y
+    assert field.distance[target_y - field.origin[1], field.target[0] - field.origin[0]] == 0
@@ -0,0 +1,293 @@
+"""Batch runs of headless game sessions across a process pool.
+
+Each instance plays the real level progression with a bot, from its own
+seed, until it reaches the target map or runs out of simulated time. The
+"seek" bot chases NPCs, jumps on them and heads for the next teleporter
+once it has the points the map requires; the "random" bot wanders. Teleports
+are streamed back to the parent as they happen, and each instance reports
+its time to each map, points per minute and per-tick cost when it finishes.
+Instances run in parallel, one per worker process, so throughput scales with
+the number of cores.
+
+    python -m tools.batch --instances 64
+    python -m tools.batch --instances 200 --workers 8 --bot random --minutes 10 --json batch.json
+"""
+import os
+os.environ.setdefault("RPGFORGE_HEADLESS", "1")
+
+import sys
+import json
+import math
+import argparse
+import multiprocessing
+import queue
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pygame
+import settings
+from game.flowfield import FlowField, UNREACHED
+from game.simulation import Simulation, KeyState
+from tools.benchmark import percentile_report
+from utils.texture_loader import load_textures
+
+DIAGONAL = 0.2  # Direction components below this don't press a key; low, so the bot lines up with gaps
+
+
+def steer(dx, dy, sprint=False, jump=False):
+    """Get the keys that move closest to the direction (dx, dy)"""
+    length = math.hypot(dx, dy)
+    pressed = []
+    if length:
+        dx, dy = dx / length, dy / length
+        if dx > DIAGONAL:
+            pressed.append(pygame.K_d)
+        elif dx < -DIAGONAL:
+            pressed.append(pygame.K_a)
+        if dy > DIAGONAL:
+            pressed.append(pygame.K_s)
+        elif dy < -DIAGONAL:
+            pressed.append(pygame.K_w)
+        if sprint:
+            pressed.append(pygame.K_LSHIFT)
+    if jump:
+        pressed.append(pygame.K_SPACE)
+    return KeyState(pressed)
+
+
+class SeekBot:
+    """Jumps on the nearest NPC until the map's points are met, then walks to the next teleporter"""
+
+    jump_range = 1.0  # Tiles to the nearest NPC to jump at
+    direct_range = 2.0  # Tiles within which the bot steers straight at an NPC instead of routing
+
+    def __init__(self):
+        # Whole-map flow field toward the tile the bot is heading for, kept while the target stays put
+        self.route = None
+        self.route_key = None
+        self.unreachable = set()  # (map, tile x, tile y) targets with no path from where the bot was
+
+    def route_to(self, game_map, x, y, tile_x, tile_y):
+        """Get the direction from (x, y) along the shortest walkable path to a tile, or None if there is none"""
+        key = (game_map, tile_x, tile_y)
+        if key in self.unreachable:
+            return None
+        if self.route_key != key:
+            self.route = FlowField(game_map.collidable, budget=0, radius=0)
+            self.route.update(tile_x, tile_y)
+            self.route_key = key
+
+        steps = self.route.distance[int(y), int(x)]
+        if steps == UNREACHED:
+            self.unreachable.add(key)
+            return None
+        if steps == 0:
+            return tile_x + 0.5 - x, tile_y + 0.5 - y
+        return self.route.direction_at(x, y)
+
+    def keys(self, sim):
+        player = sim.player
+        game_map = sim.game_map
+        x, y = player.pos.x, player.pos.y
+
+        if sim.points >= game_map.required_points:
+            exits = sorted(game_map.features.teleporters["next"],
+                           key=lambda cell: (cell[0] - x) ** 2 + (cell[1] - y) ** 2)
+            for tile_x, tile_y in exits:
+                direction = self.route_to(game_map, x, y, tile_x, tile_y)
+                if direction is not None:
+                    return steer(*direction, sprint=True)
+
+        npcs = sim.npcs
+        offset = npcs.pos[:len(npcs)] - (x, y)
+        distance = np.hypot(offset[:, 0], offset[:, 1])
+        for slot in distance.argsort():
+            if distance[slot] < self.direct_range:
+                return steer(*offset[slot], jump=distance[slot] < self.jump_range)
+            tile_x, tile_y = (int(value) for value in npcs.pos[slot])
+            direction = self.route_to(game_map, x, y, tile_x, tile_y)
+            if direction is not None:
+                return steer(*direction, sprint=distance[slot] > 5)
+        return steer(0, 0)
+
+
+class RandomWalkBot:
+    """Walks in a random direction for a random time, sprinting and jumping now and then"""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)  # Kept apart from the game's own RNG
+        self.current = steer(0, 0)
+        self.ticks_left = 0
+
+    def keys(self, sim):
+        if self.ticks_left <= 0:
+            angle = self.rng.random() * 2 * math.pi
+            self.current = steer(math.cos(angle), math.sin(angle), sprint=self.rng.random() < 0.3)
+            self.ticks_left = self.rng.randint(sim.tick_rate // 2, sim.tick_rate * 2)
+        self.ticks_left -= 1
+        if self.rng.random() < 0.02:
+            return KeyState(self.current.pressed | {pygame.K_SPACE})
+        return self.current
+
+
+# Bot name -> factory taking the instance's seed
+BOTS = {"seek": lambda seed: SeekBot(), "random": RandomWalkBot}
+
+# Per worker process
+worker_textures = None
+worker_events = None
+
+
+def init_worker(events):
+    """Load textures once per worker, and keep per-teleport prints out of the parent's output"""
+    global worker_textures, worker_events
+    sys.stdout = open(os.devnull, 'w')
+    worker_textures = load_textures()
+    worker_events = events
+
+
+def run_instance(instance, seed, bot_name, map_path, max_ticks, target_map, npc_count):
+    """Play one session to the target map or max_ticks and return its metrics"""
+    sim = Simulation(worker_textures, map_path, seed=seed, points=0, npc_count=npc_count)
+    bot = BOTS[bot_name](seed)
+    clock = time.perf_counter
+
+    arrivals = {}  # Map number -> simulated seconds of first arrival
+    tick_costs = []
+    start = clock()
+    while sim.tick < max_ticks and sim.game_map.map_number < target_map:
+        keys = bot.keys(sim)
+        tick_start = clock()
+        direction = sim.step(keys)
+        tick_costs.append(clock() - tick_start)
+
+        if direction is not None:
+            map_number = sim.game_map.map_number
+            seconds = sim.tick * sim.dt
+            arrivals.setdefault(map_number, seconds)
+            if worker_events is not None:
+                worker_events.put((instance, direction, map_number, seconds))
+    wall_seconds = clock() - start
+
+    seconds = sim.tick * sim.dt
+    result = {
+        "instance": instance,
+        "seed": sim.seed,
+        "bot": bot_name,
+        "ticks": sim.tick,
+        "sim_seconds": seconds,
+        "wall_seconds": wall_seconds,
+        "map": sim.game_map.map_number,
+        "points": sim.points,
+        "points_per_min": sim.points / seconds * 60 if seconds else 0.0,
+        "map_arrivals": arrivals,
+        "tick_cost": percentile_report(tick_costs) if tick_costs else None,
+    }
+    sim.shutdown()
+    return result
+
+
+def aggregate(results, wall_seconds):
+    """Combine per-instance results into batch totals and distributions"""
+    ticks = sum(result["ticks"] for result in results)
+    arrival_times = {}
+    for result in results:
+        for map_number, seconds in result["map_arrivals"].items():
+            arrival_times.setdefault(map_number, []).append(seconds)
+
+    points_per_min = np.array([result["points_per_min"] for result in results])
+    p50s = [result["tick_cost"]["p50_ms"] for result in results if result["tick_cost"]]
+    p99s = [result["tick_cost"]["p99_ms"] for result in results if result["tick_cost"]]
+    return {
+        "instances": len(results),
+        "ticks": ticks,
+        "wall_seconds": wall_seconds,
+        "ticks_per_sec": ticks / wall_seconds if wall_seconds else float("inf"),
+        "points_per_min_mean": float(points_per_min.mean()),
+        "points_per_min_p50": float(np.median(points_per_min)),
+        "map_arrivals": {
+            map_number: {
+                "reached": len(times),
+                "p50_sec": float(np.median(times)),
+                "mean_sec": float(np.mean(times)),
+                "max_sec": float(np.max(times)),
+            }
+            for map_number, times in sorted(arrival_times.items())
+        },
+        "tick_cost_p50_ms": float(np.median(p50s)) if p50s else 0.0,
+        "tick_cost_p99_ms": float(np.max(p99s)) if p99s else 0.0,
+    }
+
+
+def print_summary(summary, instances):
+    print(f"\n== {summary['instances']} instances, {summary['ticks']} ticks in {summary['wall_seconds']:.1f}s "
+          f"({summary['ticks_per_sec']:.0f} ticks/s) ==")
+    print(f"points per minute: mean {summary['points_per_min_mean']:.1f}, median {summary['points_per_min_p50']:.1f}")
+    print(f"tick cost: median p50 {summary['tick_cost_p50_ms']:.3f} ms, worst p99 {summary['tick_cost_p99_ms']:.3f} ms")
+    print(f"{'map':>5}{'reached':>10}{'p50 s':>10}{'mean s':>10}{'max s':>10}")
+    for map_number, row in summary["map_arrivals"].items():
+        print(f"{map_number:>5}{row['reached']:>6}/{instances:<3}{row['p50_sec']:>10.1f}"
+              f"{row['mean_sec']:>10.1f}{row['max_sec']:>10.1f}")
+
+
+def print_events(events):
+    """Print the teleports reported since the last call"""
+    try:
+        while True:
+            instance, direction, map_number, seconds = events.get_nowait()
+            print(f"[{instance:>4}] teleported {direction} to map {map_number} at {seconds:.1f}s")
+    except queue.Empty:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instances", type=int, default=16, help="Game sessions to run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="seek", help="How instances are played")
+    parser.add_argument("--minutes", type=float, default=5.0, help="Simulated minutes per instance at most")
+    parser.add_argument("--target-map", type=int, default=2, help="Stop an instance once it reaches this map")
+    parser.add_argument("--npcs", type=int, default=Simulation.npc_count, help="NPCs per map")
+    parser.add_argument("--map", default="./maps/map000.txt", help="Starting map")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first instance, the rest count up")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    max_ticks = int(args.minutes * 60 * settings.SIM_TICK_RATE)
+
+    # Spawned rather than forked workers, so none inherit the parent's SDL state
+    context = multiprocessing.get_context("spawn")
+    events = context.Queue()
+    results = []
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(args.workers, context, init_worker, (events,)) as pool:
+        pending = {pool.submit(run_instance, instance, args.seed + instance, args.bot, args.map,
+                               max_ticks, args.target_map, args.npcs)
+                   for instance in range(args.instances)}
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+
+            print_events(events)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                cost = result["tick_cost"]
+                print(f"[{result['instance']:>4}] finished on map {result['map']} after {result['sim_seconds']:.0f}s, "
+                      f"{result['points']} points ({result['points_per_min']:.1f}/min), "
+                      f"{cost['p50_ms'] if cost else 0:.3f} ms/tick")
+    print_events(events)
+
+    summary = aggregate(results, time.perf_counter() - start)
+    print_summary(summary, args.instances)
+
+    if args.json:
+        results.sort(key=lambda result: result["instance"])
+        with open(args.json, 'w') as f:
+            json.dump({"summary": summary, "instances": results}, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
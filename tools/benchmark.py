@@ -0,0 +1,223 @@
+"""Headless benchmark of the game loop subsystems.
+
+Drives the player's controls, the flow field, each system of the entity
+world and Map.draw with scripted input over generated maps of increasing size and NPC
+count, then reports per-subsystem frame-time percentiles and throughput.
+With --alloc it instead reports the memory each steady-state frame allocates,
+as traced by tracemalloc, which should not grow with the NPC count.
+
+    python -m tools.benchmark
+    python -m tools.benchmark --sizes 64 512 --npcs 100 5000 --ticks 600 --json bench.json
+    python -m tools.benchmark --alloc --npcs 5 500 5000
+"""
+import os
+os.environ.setdefault("RPGFORGE_HEADLESS", "1")
+
+import sys
+import json
+import argparse
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pygame
+import settings
+from game.camera import Camera
+from game.systems import (remember_positions, chase_system, jump_system, movement_system, animation_system,
+                          stomp_system, sound_system, render_system)
+from game.simulation import Simulation, KeyState
+from utils.texture_loader import load_textures
+
+FLOOR_TILES = (1, 2, 5, 6, 8)
+OBSTACLE_TILES = (3, 4)  # Water, trees
+
+SUBSYSTEMS = ("player", "flow_field", "npcs", "movement", "collisions", "map_draw", "sprite_draw", "frame")
+
+
+def generate_map(directory, size, seed=0, obstacle_ratio=0.1):
+    """Write a random size x size map with a central spawn point and return its path"""
+    rng = np.random.default_rng(seed)
+    grid = rng.choice(FLOOR_TILES, size=(size, size))
+    obstacles = rng.random((size, size)) < obstacle_ratio
+    grid[obstacles] = rng.choice(OBSTACLE_TILES, size=int(obstacles.sum()))
+
+    # Keep the area around the spawn point clear
+    centre = size // 2
+    grid[centre - 2:centre + 3, centre - 2:centre + 3] = 1
+    grid[centre, centre] = 0
+
+    path = os.path.join(directory, "map000.txt")
+    np.savetxt(path, grid, fmt="%d")
+    return path
+
+
+def scripted_keys(tick):
+    """Walk in a square, sprinting in bursts and jumping regularly"""
+    direction = (pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w)[(tick // 90) % 4]
+    pressed = [direction]
+    if tick % 240 < 120:
+        pressed.append(pygame.K_LSHIFT)
+    if tick % 45 == 0:
+        pressed.append(pygame.K_SPACE)
+    return KeyState(pressed)
+
+
+def percentile_report(samples):
+    values = np.array(samples) * 1000.0
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+        "per_sec": float(len(values) / (values.sum() / 1000.0)) if values.sum() else float("inf"),
+    }
+
+
+def run_case(textures, map_path, npc_count, ticks, warmup):
+    """Run one map size / NPC count combination and return its timings"""
+    sim = Simulation(textures, map_path, npc_count=npc_count)
+    camera = Camera()
+    screen = settings.screen
+    timings = {name: [] for name in SUBSYSTEMS}
+    clock = time.perf_counter
+
+    for tick in range(warmup + ticks):
+        keys = scripted_keys(tick)
+        world, player, npcs, game_map = sim.world, sim.player, sim.npcs, sim.game_map
+        frame_start = clock()
+
+        start = clock()
+        remember_positions(world)
+        player.control(sim.dt, keys)
+        target = (player.pos.x, player.pos.y)
+        after_player = clock()
+        sim.flow_field.update(int(target[0]), int(target[1]))
+        after_flow = clock()
+        chase_system(world, sim.dt, target, sim.flow_field)
+        after_npcs = clock()
+        jump_system(world, sim.dt)
+        movement_system(world, sim.dt, game_map.collidable)
+        animation_system(world, sim.dt)
+        npcs.sync_index()
+        after_movement = clock()
+        npcs.forget(stomp_system(world))
+        sound_system(world, player.pos)
+        if len(npcs) < npc_count:
+            npcs.spawn(npc_count - len(npcs), sim.level.safe_tiles)
+        after_collisions = clock()
+
+        camera.update(player.pos)
+        screen.fill("#625465")
+        game_map.draw(screen, textures, camera.position)
+        after_map = clock()
+        render_system(world, screen, camera.position)
+        end = clock()
+
+        if tick < warmup:
+            continue
+        timings["player"].append(after_player - start)
+        timings["flow_field"].append(after_flow - after_player)
+        timings["npcs"].append(after_npcs - after_flow)
+        timings["movement"].append(after_movement - after_npcs)
+        timings["collisions"].append(after_collisions - after_movement)
+        timings["map_draw"].append(after_map - after_collisions)
+        timings["sprite_draw"].append(end - after_map)
+        timings["frame"].append(end - frame_start)
+
+    sim.shutdown()
+    return {name: percentile_report(samples) for name, samples in timings.items()}
+
+
+def run_alloc_case(textures, map_path, npc_count, ticks, warmup):
+    """Run one combination under tracemalloc and return the memory allocated per frame
+
+    A frame's allocation is the peak traced memory during it above the memory
+    traced when it started, so temporaries freed within the frame count too.
+    """
+    sim = Simulation(textures, map_path, npc_count=npc_count)
+    camera = Camera()
+    screen = settings.screen
+    frame_bytes = []
+
+    tracemalloc.start()
+    for tick in range(warmup + ticks):
+        if tick == warmup:
+            start_memory = tracemalloc.get_traced_memory()[0]
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+        sim.step(scripted_keys(tick))
+        camera.update(sim.player.pos)
+        sim.game_map.draw(screen, textures, camera.position)
+        render_system(sim.world, screen, camera.position)
+
+        if tick >= warmup:
+            frame_bytes.append(tracemalloc.get_traced_memory()[1] - before)
+    end_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    sim.shutdown()
+
+    values = np.array(frame_bytes)
+    return {
+        "p50_bytes": float(np.percentile(values, 50)),
+        "p95_bytes": float(np.percentile(values, 95)),
+        "max_bytes": float(values.max()),
+        "retained_bytes": end_memory - start_memory,
+    }
+
+
+def print_case(size, npc_count, report):
+    print(f"\n== map {size}x{size}, {npc_count} NPCs ==")
+    print(f"{'subsystem':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'per sec':>12}")
+    for name in SUBSYSTEMS:
+        row = report[name]
+        print(f"{name:<12}{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}"
+              f"{row['max_ms']:>10.3f}{row['per_sec']:>12.0f}")
+
+
+def print_alloc_cases(size, rows):
+    print(f"\n== map {size}x{size}, bytes allocated per frame ==")
+    print(f"{'npcs':>8}{'p50':>12}{'p95':>12}{'max':>12}{'retained':>12}")
+    for npc_count, report in rows:
+        print(f"{npc_count:>8}{report['p50_bytes']:>12.0f}{report['p95_bytes']:>12.0f}"
+              f"{report['max_bytes']:>12.0f}{report['retained_bytes']:>12}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256, 1024], help="Map side lengths in tiles")
+    parser.add_argument("--npcs", type=int, nargs="+", default=[5, 500, 5000], help="NPC counts")
+    parser.add_argument("--ticks", type=int, default=600, help="Measured ticks per case")
+    parser.add_argument("--warmup", type=int, default=60, help="Unmeasured ticks per case")
+    parser.add_argument("--alloc", action="store_true", help="Measure memory allocated per frame instead of time")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    textures = load_textures()
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            map_dir = os.path.join(directory, str(size))
+            os.makedirs(map_dir)
+            map_path = generate_map(map_dir, size)
+            if args.alloc:
+                rows = [(npc_count, run_alloc_case(textures, map_path, npc_count, args.ticks, args.warmup))
+                        for npc_count in args.npcs]
+                print_alloc_cases(size, rows)
+                results.extend({"map_size": size, "npcs": npc_count, "ticks": args.ticks, "allocations": report}
+                               for npc_count, report in rows)
+                continue
+            for npc_count in args.npcs:
+                report = run_case(textures, map_path, npc_count, args.ticks, args.warmup)
+                print_case(size, npc_count, report)
+                results.append({"map_size": size, "npcs": npc_count, "ticks": args.ticks, "subsystems": report})
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
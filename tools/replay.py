@@ -0,0 +1,77 @@
+"""Headless playback of recorded sessions.
+
+Re-runs each replay with its seed, map and keys as fast as the CPU allows,
+reporting simulation throughput and a digest of the final state. The same
+replay and code always give the same digest, so a changed digest means the
+simulation's behaviour changed.
+
+    RPGFORGE_RECORD=session.rpgr python main.py
+    python -m tools.replay session.rpgr
+    python -m tools.replay recordings/*.rpgr --json results.json
+"""
+import os
+os.environ.setdefault("RPGFORGE_HEADLESS", "1")
+
+import sys
+import json
+import argparse
+import time
+from game.replay import Replay
+from game.simulation import Simulation
+from utils.texture_loader import load_textures
+
+
+def play(textures, replay):
+    """Run one replay to the end and return its results"""
+    sim = Simulation(textures, replay.map_path, replay.tick_rate, replay.seed, replay.points)
+    key_states = replay.key_states()
+
+    start = time.perf_counter()
+    sim.run(len(key_states), key_states.__getitem__)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "ticks": len(key_states),
+        "seconds": elapsed,
+        "ticks_per_sec": len(key_states) / elapsed if elapsed else float("inf"),
+        "speedup": len(key_states) / replay.tick_rate / elapsed if elapsed else float("inf"),
+        "map": sim.game_map.map_number,
+        "points": sim.points,
+        "digest": sim.state_digest(),
+    }
+    sim.shutdown()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("replays", nargs="+", help="Replay files to play back")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    textures = load_textures()
+    results = []
+    total_ticks = 0
+    total_seconds = 0.0
+
+    print(f"{'replay':<32}{'ticks':>10}{'ticks/s':>12}{'speedup':>10}{'map':>5}{'points':>8}  digest")
+    for path in args.replays:
+        result = play(textures, Replay.load(path))
+        result["replay"] = path
+        results.append(result)
+        total_ticks += result["ticks"]
+        total_seconds += result["seconds"]
+        print(f"{os.path.basename(path):<32}{result['ticks']:>10}{result['ticks_per_sec']:>12.0f}"
+              f"{result['speedup']:>9.1f}x{result['map']:>5}{result['points']:>8}  {result['digest']}")
+
+    if len(results) > 1 and total_seconds:
+        print(f"{len(results)} replays, {total_ticks} ticks at {total_ticks / total_seconds:.0f} ticks/s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
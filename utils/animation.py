@@ -0,0 +1,83 @@
+"""Animation frames of the sprites, pre-scaled when textures load
+
+Each animated sprite gets a FrameTable holding, for every pose (direction it
+can face), a walk cycle and a jump as ready-made surfaces, so nothing is
+scaled while drawing. An entity's current frame is a single index into its
+table, kept up to date by the animation system.
+"""
+import math
+import numpy as np
+import pygame
+
+WALK_FPS = 8  # Walk cycle frames per second of movement
+JUMP_FRAMES = 8  # Over the second a jump lasts
+
+# (width, height) scale of each walk cycle frame: a squash and stretch, feet kept on the ground
+WALK_CYCLE = ((1.0, 1.0), (1.08, 0.92), (1.0, 1.0), (0.94, 1.06))
+
+# Sprite -> (texture of each pose, anchor, jump scale).
+# The anchor is where the entity's position falls on its sprite, as fractions of the sprite's size;
+# the jump scale is how much bigger the sprite gets at the top of a jump.
+ANIMATIONS = {
+    'player': (('player_default', 'player_up', 'player_down', 'player_left', 'player_right'), (0.5, 0.5), 2.0),
+    'npc': (('npc_right', 'npc_left'), (0.0, 0.0), 1.25),
+}
+
+
+def scaled(surface, scale_x, scale_y):
+    """Get a surface scaled without smoothing (the textures are pixel art), or itself at 1:1"""
+    if scale_x == 1.0 and scale_y == 1.0:
+        return surface
+    width, height = surface.get_size()
+    return pygame.transform.scale(surface, (max(1, round(width * scale_x)), max(1, round(height * scale_y))))
+
+
+class FrameTable:
+    """Every frame of one sprite's poses, flattened for lookup by index
+
+    Frame pose * stride + i is walk frame i of a pose, for i below
+    walk_frames, and jump frame i - walk_frames after that. offset_x and
+    offset_y place each frame relative to the entity's position: walk
+    frames stand on the bottom edge of the pose's texture, jump frames grow
+    from its centre.
+    """
+
+    def __init__(self, poses, anchor=(0.0, 0.0), jump_scale=1.0):
+        self.walk_frames = len(WALK_CYCLE)
+        self.jump_frames = JUMP_FRAMES
+        self.stride = self.walk_frames + self.jump_frames
+        self.poses = len(poses)
+
+        frames = []
+        offsets = []
+        for texture in poses:
+            width, height = texture.get_size()
+            anchor_x, anchor_y = anchor[0] * width, anchor[1] * height
+            for scale_x, scale_y in WALK_CYCLE:
+                frame = scaled(texture, scale_x, scale_y)
+                frames.append(frame)
+                offsets.append(((width - frame.get_width()) // 2 - anchor_x, height - frame.get_height() - anchor_y))
+            for i in range(JUMP_FRAMES):
+                # Biggest at the top of the jump, sampled at the middle of each frame's part of it
+                scale = 1.0 + (jump_scale - 1.0) * math.sin((i + 0.5) / JUMP_FRAMES * math.pi)
+                frame = scaled(texture, scale, scale)
+                frames.append(frame)
+                offsets.append(((width - frame.get_width()) // 2 - anchor_x,
+                                (height - frame.get_height()) // 2 - anchor_y))
+
+        self.surfaces = np.empty(len(frames), dtype=object)
+        for i, frame in enumerate(frames):
+            self.surfaces[i] = frame
+        self.offset_x = np.array([offset[0] for offset in offsets], dtype=np.float64)
+        self.offset_y = np.array([offset[1] for offset in offsets], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.surfaces)
+
+
+def build_frame_tables(textures):
+    """Get sprite name -> FrameTable for every sprite in ANIMATIONS"""
+    tables = {}
+    for name, (keys, anchor, jump_scale) in ANIMATIONS.items():
+        tables[name] = FrameTable([textures[key] for key in keys], anchor, jump_scale)
+    return tables
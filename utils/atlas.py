@@ -0,0 +1,170 @@
+"""Packed texture atlas.
+
+The PNGs in textures/ stay the source format. Every texture the game uses is
+scaled to the size it is drawn at and packed into a few sheets in
+textures/atlas/, with atlas.json indexing them:
+
+    tile_size  TILE_SIZE the atlas was packed for
+    sources    path -> [mtime_ns, size] of each source image
+    sheets     [{"file", "alpha"}, ...], opaque and alpha textures are kept apart
+    textures   "path_size_alpha" -> [sheet, x, y, width, height]
+
+Run `python -m utils.atlas` to pack the atlas up front.
+"""
+import os
+import json
+import pygame
+from settings import TILE_SIZE
+from utils.pixel_cache import pixel_cache
+
+ATLAS_DIR = "./textures/atlas"
+INDEX_FILE = "atlas.json"
+VERSION = 1
+MAX_SHEET_SIZE = 2048
+
+
+def texture_key(path, size, use_alpha):
+    """Key of a texture in the atlas index, matching the in-memory texture cache"""
+    return f"{path}_{size}_{use_alpha}"
+
+
+def source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def shelf_pack(sizes, max_size=MAX_SHEET_SIZE):
+    """Place (width, height) rects on shelves, returning (sheet, x, y) per rect and each sheet's size"""
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i][1], reverse=True)
+    placements = [None] * len(sizes)
+    sheet_sizes = []
+    sheet = -1
+    x = y = shelf_height = max_size  # Forces a new sheet for the first rect
+
+    for i in order:
+        width, height = sizes[i]
+        if x + width > max_size:
+            # Next shelf
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        if y + height > max_size:
+            # Next sheet
+            sheet += 1
+            sheet_sizes.append([0, 0])
+            x = y = shelf_height = 0
+        placements[i] = (sheet, x, y)
+        x += width
+        shelf_height = max(shelf_height, height)
+        sheet_sizes[sheet][0] = max(sheet_sizes[sheet][0], x)
+        sheet_sizes[sheet][1] = max(sheet_sizes[sheet][1], y + height)
+
+    return placements, sheet_sizes
+
+
+def pack_atlas(entries, directory=ATLAS_DIR):
+    """Scale and pack (path, size, use_alpha) textures into sheets, returning the index
+
+    Missing or unreadable sources are left out; the loader falls back for them.
+    """
+    os.makedirs(directory, exist_ok=True)
+    decoded = {}  # Each source is decoded once, however many sizes it is used at
+    scaled = {False: [], True: []}
+    sources = {}
+
+    for path, size, use_alpha in dict.fromkeys(entries):
+        if path not in decoded:
+            try:
+                decoded[path] = pygame.image.load(path)
+                sources[path] = source_stamp(path)
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Skipping texture {path}: {e}")
+                decoded[path] = None
+        if decoded[path] is not None:
+            scaled[use_alpha].append((texture_key(path, size, use_alpha),
+                                      pygame.transform.scale(decoded[path], (size, size))))
+
+    index = {"version": VERSION, "tile_size": TILE_SIZE, "sources": sources, "sheets": [], "textures": {}}
+    for use_alpha, images in scaled.items():
+        if not images:
+            continue
+        placements, sheet_sizes = shelf_pack([image.get_size() for _, image in images])
+        first_sheet = len(index["sheets"])
+        sheets = [pygame.Surface(size, pygame.SRCALPHA) for size in sheet_sizes]
+
+        for (key, image), (sheet, x, y) in zip(images, placements):
+            sheets[sheet].blit(image, (x, y))
+            index["textures"][key] = [first_sheet + sheet, x, y, *image.get_size()]
+
+        for sheet in sheets:
+            name = f"sheet{len(index['sheets']):03d}.png"
+            pygame.image.save(sheet, os.path.join(directory, name))
+            index["sheets"].append({"file": name, "alpha": use_alpha})
+
+    # Written last, so a half-packed atlas is never picked up
+    tmp_path = os.path.join(directory, INDEX_FILE + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(directory, INDEX_FILE))
+    return index
+
+
+def read_index(directory=ATLAS_DIR):
+    try:
+        with open(os.path.join(directory, INDEX_FILE), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def is_stale(index, entries):
+    """Check whether the atlas is missing textures or was packed from older sources"""
+    if index is None or index.get("version") != VERSION or index.get("tile_size") != TILE_SIZE:
+        return True
+    sources = index["sources"]
+    for path, size, use_alpha in entries:
+        if path not in sources:
+            if os.path.exists(path):
+                return True
+            continue  # Missing source, falls back either way
+        if texture_key(path, size, use_alpha) not in index["textures"]:
+            return True
+    for path, stamp in sources.items():
+        try:
+            if source_stamp(path) != stamp:
+                return True
+        except FileNotFoundError:
+            return True
+    return False
+
+
+def load_atlas(entries, directory=ATLAS_DIR):
+    """Get key -> subsurface for the textures in entries, repacking the atlas when stale
+
+    Returns None if the atlas can be neither loaded nor packed.
+    """
+    index = read_index(directory)
+    if is_stale(index, entries):
+        try:
+            index = pack_atlas(entries, directory)
+        except (OSError, pygame.error) as e:
+            print(f"Could not pack texture atlas in {directory}: {e}")
+            return None
+
+    try:
+        sheets = []
+        for sheet in index["sheets"]:
+            sheets.append(pixel_cache.load(os.path.join(directory, sheet["file"]), None, sheet["alpha"]))
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Error loading texture atlas: {e}")
+        return None
+
+    return {key: sheets[sheet].subsurface((x, y, width, height))
+            for key, (sheet, x, y, width, height) in index["textures"].items()}
+
+
+if __name__ == "__main__":
+    from game.tiles import tile_registry
+    from utils.texture_loader import texture_entries
+
+    index = pack_atlas(texture_entries(tile_registry()))
+    print(f"Packed {len(index['textures'])} textures into {len(index['sheets'])} sheets in {ATLAS_DIR}")
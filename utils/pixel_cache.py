@@ -0,0 +1,127 @@
+import os
+import json
+import hashlib
+import pygame
+import settings
+
+
+class PixelCache:
+    """On-disk cache of decoded, scaled texture pixels
+
+    Entries are raw RGB/RGBA buffers named by the source file's content hash,
+    the target size and the alpha mode, so a hit is a single read and a
+    frombuffer with no PNG decode or scaling. An index of source stats avoids
+    re-hashing files that have not changed since the last launch.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = settings.TEXTURE_CACHE_DIR if directory is None else directory
+        self.index_path = os.path.join(self.directory, "index.json") if self.directory else None
+        self.index = None  # path -> [mtime_ns, size, sha1, native size], read on first use
+        self.dirty = False
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def load_index(self):
+        if self.index is None:
+            try:
+                with open(self.index_path, 'r') as f:
+                    self.index = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.index = {}
+        return self.index
+
+    def save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def source_entry(self, path):
+        """Get a source file's [mtime_ns, size, sha1, native size] index entry, only hashing it when its stat changed"""
+        index = self.load_index()
+        stat = os.stat(path)
+        entry = index.get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        if entry and entry[2] != digest:
+            # Drop the pixels of the source's previous contents
+            for name in os.listdir(self.directory):
+                if name.startswith(entry[2]):
+                    os.remove(os.path.join(self.directory, name))
+        entry = index[path] = [stat.st_mtime_ns, stat.st_size, digest, None]
+        self.dirty = True
+        return entry
+
+    def entry_path(self, digest, size, use_alpha):
+        width, height = size
+        return os.path.join(self.directory, f"{digest}_{width}x{height}_{'rgba' if use_alpha else 'rgb'}.raw")
+
+    def load(self, path, size=None, use_alpha=False):
+        """Get a display-ready surface of an image, scaled to size (width, height) if given
+
+        Raises pygame.error or FileNotFoundError like pygame.image.load.
+        """
+        if not self.enabled:
+            return self.decode(path, size, use_alpha)
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            entry = self.source_entry(path)
+        except OSError as e:
+            if not os.path.exists(path):
+                raise
+            print(f"Texture cache unavailable in {self.directory}: {e}")
+            return self.decode(path, size, use_alpha)
+        fmt = "RGBA" if use_alpha else "RGB"
+        target_size = tuple(size or entry[3] or ())
+        if target_size:
+            try:
+                with open(self.entry_path(entry[2], target_size, use_alpha), 'rb') as f:
+                    return self.finish(pygame.image.frombuffer(f.read(), target_size, fmt), use_alpha)
+            except (FileNotFoundError, ValueError):
+                pass
+
+        surface = self.decode(path, size, use_alpha)
+        if size is None:
+            entry[3] = list(surface.get_size())
+            self.dirty = True
+        try:
+            entry_path = self.entry_path(entry[2], surface.get_size(), use_alpha)
+            tmp_path = entry_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(pygame.image.tobytes(surface, fmt))
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            print(f"Could not write texture cache entry for {path}: {e}")
+        return surface
+
+    def flush(self):
+        """Write the index if it changed"""
+        if self.enabled and self.dirty:
+            try:
+                self.save_index()
+                self.dirty = False
+            except OSError as e:
+                print(f"Could not write texture cache index: {e}")
+
+    def decode(self, path, size, use_alpha):
+        surface = self.finish(pygame.image.load(path), use_alpha)
+        if size is not None:
+            surface = pygame.transform.scale(surface, size)
+        return surface
+
+    def finish(self, surface, use_alpha):
+        """Convert to the display format when there is a display"""
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if use_alpha else surface.convert()
+
+
+# Shared cache for the texture loader and the atlas
+pixel_cache = PixelCache()
@@ -0,0 +1,107 @@
+import json
+import os
+import time
+from collections import deque
+from contextlib import nullcontext
+import settings
+
+# Shared do-nothing scope handed out while profiling is off
+NULL_SCOPE = nullcontext()
+
+PERCENTILES = (50, 95, 99)  # Of the per-frame times in a phase's history
+
+
+class Scope:
+    """Times one run of a named phase"""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Profiler:
+    """Named scoped timers with rolling per-phase history and a Chrome trace buffer"""
+
+    def __init__(self, history=None, trace_events=None):
+        self.enabled = settings.PROFILE
+        self.history = history or settings.PROFILE_HISTORY  # Frames kept per phase
+        self.phases = {}  # name -> deque of per-frame milliseconds
+        self.frame_times = deque(maxlen=self.history)
+        self.frame_totals = {}  # name -> milliseconds so far this frame
+        self.frame_start = None
+        self.origin = time.perf_counter()
+
+        # (name, start_us, duration_us) for export, oldest dropped first
+        self.trace = deque(maxlen=trace_events or settings.PROFILE_TRACE_EVENTS)
+
+    def scope(self, name):
+        """Context manager timing a phase; free of bookkeeping while disabled"""
+        if not self.enabled:
+            return NULL_SCOPE
+        return Scope(self, name)
+
+    def record(self, name, start, end):
+        duration = end - start
+        self.frame_totals[name] = self.frame_totals.get(name, 0.0) + duration * 1000.0
+        self.trace.append((name, (start - self.origin) * 1e6, duration * 1e6))
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Close the frame, pushing its phase totals into the rolling history"""
+        if not self.enabled or self.frame_start is None:
+            self.frame_start = None
+            return
+        end = time.perf_counter()
+        self.frame_times.append((end - self.frame_start) * 1000.0)
+        self.trace.append(("frame", (self.frame_start - self.origin) * 1e6, (end - self.frame_start) * 1e6))
+
+        for name in self.phases.keys() | self.frame_totals.keys():
+            if name not in self.phases:
+                self.phases[name] = deque(maxlen=self.history)
+            self.phases[name].append(self.frame_totals.get(name, 0.0))
+        self.frame_totals.clear()
+        self.frame_start = None
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.frame_start = None
+        self.frame_totals.clear()
+
+    def phase_stats(self, name):
+        """Get (average, (p50, p95, p99), maximum) milliseconds per frame for a phase over its history"""
+        samples = self.phases.get(name)
+        if not samples:
+            return 0.0, (0.0,) * len(PERCENTILES), 0.0
+        ordered = sorted(samples)
+        count = len(ordered)
+        percentiles = tuple(ordered[min(count - 1, count * percent // 100)] for percent in PERCENTILES)
+        return sum(ordered) / count, percentiles, ordered[-1]
+
+    def export_chrome_trace(self, path):
+        """Write the buffered events as Chrome trace JSON (chrome://tracing, Perfetto)"""
+        events = [{"name": name, "ph": "X", "ts": round(start, 3), "dur": round(duration, 3),
+                   "pid": 0, "tid": 0}
+                  for name, start, duration in self.trace]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+# Shared profiler for the game loop
+profiler = Profiler()
@@ -0,0 +1,24 @@
+import numpy as np
+
+
+class ScratchBuffers:
+    """Named work arrays reused from one call to the next
+
+    get() hands out the first n rows of a buffer kept under a name, growing it
+    (to double the size) only when more rows are asked for than it has, so a
+    steady-state caller allocates nothing but the small view objects. Views
+    from one name are overwritten by the next get() of that name.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+
+    def get(self, name, n, dtype=np.float64, columns=None):
+        buffer = self.buffers.get(name)
+        if buffer is None or len(buffer) < n:
+            shape = (max(n, 2 * len(buffer) if buffer is not None else 64),)
+            if columns is not None:
+                shape += (columns,)
+            buffer = np.zeros(shape, dtype=dtype)
+            self.buffers[name] = buffer
+        return buffer[:n]
@@ -1,53 +1,280 @@
 import pygame
 import os
+import io
+import time
+import settings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 
-# Initialize pygame mixer
-pygame.mixer.init()
-
-# Sound cache to avoid loading the same sound multiple times
-sound_cache = {}
-
-def load_sound(path, volume=0.5):
-    """Load and cache a sound for efficient reuse"""
-    if path not in sound_cache:
-        try:
-            if os.path.exists(path):
-                sound = pygame.mixer.Sound(path)
-                sound.set_volume(volume)
-                sound_cache[path] = sound
-            else:
-                print(f"Sound file not found: {path}")
-                return None
-        except pygame.error as e:
-            print(f"Error loading sound {path}: {e}")
+# Initialize pygame mixer, unless running headless; without an audio device every sound is a no-op
+AUDIO_AVAILABLE = False
+if settings.SOUND_ENABLED:
+    try:
+        pygame.mixer.init()
+        AUDIO_AVAILABLE = True
+    except pygame.error as e:
+        print(f"Audio unavailable, sound disabled: {e}")
+
+def sound_path(sound_name):
+    return f"./sounds/{sound_name}.mp3"
+
+def music_path(music_name):
+    return f"./sounds/music/{music_name}.mp3"
+
+
+class AudioAssets:
+    """Decode sounds on worker threads and keep them in a byte-budgeted LRU
+
+    Nothing here blocks the game loop: a sound that is not decoded yet is
+    queued and reported as missing, and background music is read on a
+    worker and handed to the mixer, which decodes it as it streams.
+    Finished work is picked up by collect(), called once per frame.
+    """
+
+    def __init__(self, budget_mb=None, workers=None):
+        budget_mb = settings.SOUND_CACHE_BUDGET_MB if budget_mb is None else budget_mb
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.workers = workers or settings.AUDIO_LOAD_WORKERS
+        self.sounds = OrderedDict()  # path -> Sound, least recently used first
+        self.sizes = {}  # path -> decoded PCM bytes
+        self.used_bytes = 0
+        self.pending = {}  # path -> Future of a Sound
+        self.failed = set()  # Paths that are missing or could not be decoded
+        self.music = None  # (Future of the file bytes, path, volume, loops) waiting to start
+        self.executor = None
+
+    def submit(self, function, *args):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="audio")
+        return self.executor.submit(function, *args)
+
+    def request(self, path):
+        """Start decoding a sound in the background unless it is loaded or under way"""
+        if path in self.sounds or path in self.pending or path in self.failed:
+            return
+        if not os.path.exists(path):
+            print(f"Sound file not found: {path}")
+            self.failed.add(path)
+            return
+        self.pending[path] = self.submit(pygame.mixer.Sound, path)
+
+    def preload(self, sound_names):
+        """Queue a catalogue of sounds, e.g. at startup or on level load"""
+        if AUDIO_AVAILABLE:
+            for sound_name in sound_names:
+                self.request(sound_path(sound_name))
+
+    def pcm_bytes(self, sound):
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * abs(size) // 8
+
+    def store(self, path, sound):
+        self.sounds[path] = sound
+        self.sizes[path] = self.pcm_bytes(sound)
+        self.used_bytes += self.sizes[path]
+        # Evict least recently used sounds, never the one just decoded
+        while self.used_bytes > self.budget_bytes and len(self.sounds) > 1:
+            evicted, _ = self.sounds.popitem(last=False)
+            self.used_bytes -= self.sizes.pop(evicted)
+
+    def collect(self):
+        """Move finished decodes into the cache and start music that finished loading"""
+        for path, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[path]
+                try:
+                    self.store(path, future.result())
+                except pygame.error as e:
+                    print(f"Error loading sound {path}: {e}")
+                    self.failed.add(path)
+
+        if self.music is not None and self.music[0].done():
+            future, path, volume, loops = self.music
+            self.music = None
+            try:
+                pygame.mixer.music.load(io.BytesIO(future.result()), "mp3")
+                pygame.mixer.music.set_volume(volume)
+                pygame.mixer.music.play(loops)
+            except (pygame.error, OSError) as e:
+                print(f"Error playing music {path}: {e}")
+
+    def get(self, path):
+        """Get a decoded sound, or None (queuing it) if it is not ready yet"""
+        sound = self.sounds.get(path)
+        if sound is not None:
+            self.sounds.move_to_end(path)
+            return sound
+        self.collect()
+        if path in self.sounds:
+            return self.get(path)
+        self.request(path)
+        return None
+
+    def is_ready(self, sound_name):
+        self.collect()
+        return sound_path(sound_name) in self.sounds
+
+    def ready(self):
+        """Check whether every queued decode has finished"""
+        self.collect()
+        return not self.pending
+
+    def wait(self, sound_names=None, timeout=None):
+        """Block until the given sounds (all queued ones by default) are decoded"""
+        if sound_names is None:
+            futures = list(self.pending.values())
+        else:
+            futures = [self.pending[sound_path(name)] for name in sound_names if sound_path(name) in self.pending]
+        wait(futures, timeout)
+        self.collect()
+
+    def play_music(self, path, volume, loops):
+        self.music = (self.submit(read_file, path), path, volume, loops)
+
+    def cancel_music(self):
+        self.music = None
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def load_sound(path):
+    """Get a decoded sound, or None while it is still decoding in the background"""
+    return audio_assets.get(path)
+
+
+class SoundRule:
+    """How a sound competes for channels"""
+
+    __slots__ = ("priority", "max_voices", "min_interval")
+
+    def __init__(self, priority=5, max_voices=2, min_interval_ms=0):
+        self.priority = priority  # Higher may take channels from lower
+        self.max_voices = max_voices  # Copies playing at once; the oldest is restarted beyond this
+        self.min_interval = min_interval_ms / 1000.0  # Triggers closer together than this are dropped
+
+
+class SoundEngine:
+    """Plays effects on a fixed pool of mixer channels
+
+    Each play is bounded by the pool size rather than by how many entities
+    trigger sounds: rate-limited triggers are coalesced, a sound never holds
+    more than its max_voices channels, and when every channel is busy the
+    lowest priority, oldest voice is stolen if the new sound ranks at least
+    as high.
+    """
+
+    def __init__(self, channel_count=None, rules=None, hearing_range=None):
+        self.channel_count = channel_count or settings.SOUND_CHANNELS
+        self.rules = rules if rules is not None else SOUND_RULES
+        self.hearing_range = hearing_range or settings.SOUND_HEARING_RANGE
+        self.default_rule = SoundRule()
+        self.last_played = {}  # Sound name -> time of the last accepted trigger
+        self.channels = None
+        self.voices = None  # Per channel: (name, priority, start time) of what was last played on it
+
+    def init_channels(self):
+        pygame.mixer.set_num_channels(self.channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+        self.voices = [None] * self.channel_count
+
+    def attenuation(self, distance):
+        """Linear falloff to silence at the hearing range (distance in tiles)"""
+        if distance is None:
+            return 1.0
+        return max(0.0, 1.0 - distance / self.hearing_range)
+
+    def play(self, sound_name, volume=None, distance=None):
+        """Play a sound at volume, quieter with distance; returns the channel used or None"""
+        if not AUDIO_AVAILABLE:
+            return None
+        if self.channels is None:
+            self.init_channels()
+
+        rule = self.rules.get(sound_name, self.default_rule)
+        now = time.perf_counter()
+        if now - self.last_played.get(sound_name, -1e9) < rule.min_interval:
+            return None
+
+        volume = (0.5 if volume is None else volume) * self.attenuation(distance)
+        if volume <= 0.0:
+            return None
+        sound = load_sound(sound_path(sound_name))
+        if sound is None:
+            return None
+
+        index = self.pick_channel(sound_name, rule)
+        if index is None:
             return None
-    return sound_cache[path]
+        self.last_played[sound_name] = now
+        channel = self.channels[index]
+        channel.play(sound)
+        channel.set_volume(volume)
+        self.voices[index] = (sound_name, rule.priority, now)
+        return channel
+
+    def pick_channel(self, sound_name, rule):
+        """Get the channel index to play on, or None to drop the sound"""
+        own = []
+        free = None
+        victim = None
+        for index, channel in enumerate(self.channels):
+            voice = self.voices[index]
+            if voice is None or not channel.get_busy():
+                if free is None:
+                    free = index
+                continue
+            if voice[0] == sound_name:
+                own.append(index)
+            # Lowest priority first, then oldest
+            if victim is None or (voice[1], voice[2]) < (self.voices[victim][1], self.voices[victim][2]):
+                victim = index
+
+        if len(own) >= rule.max_voices:
+            return min(own, key=lambda index: self.voices[index][2])
+        if free is not None:
+            return free
+        if victim is not None and self.voices[victim][1] <= rule.priority:
+            return victim
+        return None
 
-def play_sound(sound_name, volume=None):
-    """Play a sound by name"""
-    sound = load_sound(f"./sounds/{sound_name}.mp3", volume or 0.5)
-    if sound:
-        sound.play()
+    def stop_all(self):
+        if self.channels is not None:
+            for channel in self.channels:
+                channel.stop()
+
+
+def play_sound(sound_name, volume=None, distance=None):
+    """Play a sound by name, optionally attenuated by distance in tiles from the player"""
+    return sound_engine.play(sound_name, volume, distance)
 
 def play_bgm(music_name, volume=0.3, loops=-1):
-    """Play background music, loops by default"""
-    music_path = f"./sounds/music/{music_name}.mp3"
-    if os.path.exists(music_path):
-        try:
-            pygame.mixer.music.load(music_path)
-            pygame.mixer.music.set_volume(volume)
-            pygame.mixer.music.play(loops)
-        except pygame.error as e:
-            print(f"Error playing music {music_path}: {e}")
+    """Play background music, loops by default; it starts once read in the background"""
+    if not AUDIO_AVAILABLE:
+        return
+    path = music_path(music_name)
+    if os.path.exists(path):
+        audio_assets.play_music(path, volume, loops)
     else:
-        print(f"Music file not found: {music_path}")
+        print(f"Music file not found: {path}")
 
 def stop_bgm():
     """Stop the currently playing background music"""
+    if not AUDIO_AVAILABLE:
+        return
+    audio_assets.cancel_music()
     pygame.mixer.music.stop()
 
 def set_bgm_volume(volume):
     """Set the volume of the background music (0.0 to 1.0)"""
+    if not AUDIO_AVAILABLE:
+        return
     pygame.mixer.music.set_volume(max(0.0, min(1.0, volume)))
 
 
@@ -71,4 +298,29 @@ class GameSounds:
     # Music tracks
     MAIN_THEME = "main_theme"
     LEVEL_1 = "level_1"
-    LEVEL_2 = "level_2"
\ No newline at end of file
+    LEVEL_2 = "level_2"
+
+
+# Priorities, voice caps and rate limits; sounds not listed use SoundRule()
+SOUND_RULES = {
+    GameSounds.GAME_START: SoundRule(priority=10, max_voices=1),
+    GameSounds.LEVEL_COMPLETE: SoundRule(priority=10, max_voices=1),
+    GameSounds.PLAYER_TELEPORT: SoundRule(priority=8, max_voices=1, min_interval_ms=200),
+    GameSounds.NPC_HIT: SoundRule(priority=7, max_voices=2, min_interval_ms=50),
+    GameSounds.POINT_COLLECT: SoundRule(priority=7, max_voices=2, min_interval_ms=50),
+    GameSounds.PLAYER_JUMP: SoundRule(priority=6, max_voices=1, min_interval_ms=100),
+    GameSounds.PLAYER_SPRINT: SoundRule(priority=4, max_voices=1, min_interval_ms=150),
+    GameSounds.PLAYER_WALK: SoundRule(priority=3, max_voices=1, min_interval_ms=150),
+    GameSounds.NPC_JUMP: SoundRule(priority=2, max_voices=2, min_interval_ms=250),
+}
+
+# Every effect, decoded in the background at startup
+SOUND_EFFECTS = (
+    GameSounds.PLAYER_JUMP, GameSounds.PLAYER_WALK, GameSounds.PLAYER_SPRINT, GameSounds.PLAYER_TELEPORT,
+    GameSounds.NPC_HIT, GameSounds.NPC_JUMP,
+    GameSounds.POINT_COLLECT, GameSounds.LEVEL_COMPLETE, GameSounds.GAME_START,
+)
+
+# Shared decoded sounds and engine for all sound effects
+audio_assets = AudioAssets()
+sound_engine = SoundEngine()
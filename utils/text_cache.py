@@ -0,0 +1,83 @@
+import pygame
+from collections import OrderedDict
+import settings
+
+
+class GlyphAtlas:
+    """Pre-rendered characters of one font and colour for text that changes every frame"""
+
+    # Rendered up front; anything else is added the first time it is drawn
+    preload = "0123456789.,:-+()%/ "
+
+    def __init__(self, font, color):
+        self.font = font
+        self.color = color
+        self.glyphs = {}
+        for char in self.preload:
+            self.glyph(char)
+
+    def glyph(self, char):
+        surface = self.glyphs.get(char)
+        if surface is None:
+            surface = self.font.render(char, True, self.color)
+            self.glyphs[char] = surface
+        return surface
+
+    def width(self, text):
+        return sum(self.glyph(char).get_width() for char in text)
+
+    def draw(self, screen, text, pos):
+        """Blit text glyph by glyph and return the x coordinate after it"""
+        x, y = pos
+        blit_list = []
+        for char in text:
+            surface = self.glyph(char)
+            blit_list.append((surface, (x, y)))
+            x += surface.get_width()
+        screen.blits(blit_list, False)
+        return x
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (string, colour, font)"""
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity or settings.TEXT_CACHE_SIZE
+        self.surfaces = OrderedDict()
+        self.atlases = {}
+
+    def render(self, text, color, font=None):
+        """Get a rendered surface for a string, rendering it only on a cache miss"""
+        font = font or settings.font
+        key = (text, tuple(color), font)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def glyph_atlas(self, color, font=None):
+        """Get the glyph atlas for a font and colour"""
+        font = font or settings.font
+        key = (tuple(color), font)
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            atlas = GlyphAtlas(font, color)
+            self.atlases[key] = atlas
+        return atlas
+
+    def draw(self, screen, label, value, color, pos, font=None):
+        """Blit a static label from the cache followed by a fast-changing value from glyphs, returning the rect covered"""
+        label_surface = self.render(label, color, font)
+        screen.blit(label_surface, pos)
+        end_x = self.glyph_atlas(color, font).draw(screen, value, (pos[0] + label_surface.get_width(), pos[1]))
+        return pygame.Rect(pos[0], pos[1], end_x - pos[0], label_surface.get_height())
+
+
+# Shared cache for HUD and overlay text
+text_cache = TextCache()
@@ -1,7 +1,10 @@
 import pygame
-import json
 import os
 from settings import TILE_SIZE
+from utils.atlas import texture_key, load_atlas
+from utils.pixel_cache import pixel_cache
+from utils.animation import build_frame_tables
+from game.tiles import tile_registry
 
 # Texture cache to avoid loading the same texture multiple times
 texture_cache = {}
@@ -18,16 +21,11 @@ def create_fallback_texture(size=TILE_SIZE):
 
 def get_texture(path, size=TILE_SIZE, use_alpha=False):
     """Load and cache textures for efficient reuse"""
-    cache_key = f"{path}_{size}_{use_alpha}"
+    cache_key = texture_key(path, size, use_alpha)
     if cache_key not in texture_cache:
         try:
             if os.path.exists(path):
-                if use_alpha:
-                    img = pygame.image.load(path).convert_alpha()
-                    texture_cache[cache_key] = pygame.transform.scale(img, (size, size))
-                else:
-                    img = pygame.image.load(path).convert()
-                    texture_cache[cache_key] = pygame.transform.scale(img, (size, size))
+                texture_cache[cache_key] = pixel_cache.load(path, (size, size), use_alpha)
             else:
                 print(f"Texture file not found: {path}")
                 texture_cache[cache_key] = create_fallback_texture(size)
@@ -36,79 +34,59 @@ def get_texture(path, size=TILE_SIZE, use_alpha=False):
             texture_cache[cache_key] = create_fallback_texture(size)
     return texture_cache[cache_key]
 
+# Sprite textures: key -> (path, size, use_alpha)
+SPRITES = {
+    'player_default': ("./textures/player/default.png", TILE_SIZE, True),
+    'player_up': ("./textures/player/up.png", TILE_SIZE, True),
+    'player_down': ("./textures/player/down.png", TILE_SIZE, True),
+    'player_right': ("./textures/player/right.png", TILE_SIZE, True),
+    'player_left': ("./textures/player/left.png", TILE_SIZE, True),
+    'npc_left': ("./textures/player/npc_left.png", 16, True),
+    'npc_right': ("./textures/player/npc_right.png", 16, True),
+}
+
+def tile_texture_path(texture_file):
+    return f"./textures/tiles/{texture_file}"
+
+def texture_entries(registry):
+    """Get (path, size, use_alpha) of every texture the game loads"""
+    entries = [(tile_texture_path(registry.textures[tile_id]), TILE_SIZE, False)
+               for tile_id in registry.ids if registry.textures[tile_id]]
+    entries.extend(SPRITES.values())
+    return entries
+
 def load_textures():
-    """Load all game textures based on mapdata.json"""
+    """Load all game textures for the tiles in the tile registry"""
     textures = {}
+    registry = tile_registry()
     
     # Create a default fallback texture for missing textures
     fallback_texture = create_fallback_texture()
     textures['fallback'] = fallback_texture
     
-    # Load tile metadata from JSON
-    try:
-        with open("./mapdata.json", 'r') as f:
-            map_data = json.load(f)
-            tile_data = map_data.get("tiles", {})
-    except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
-        print(f"Error loading mapdata.json: {e}")
-        tile_data = {}  # Use empty dict if file not found or invalid
+    # Decode the packed atlas sheets once; get_texture then hands out their subsurfaces
+    atlas = load_atlas(texture_entries(registry))
+    if atlas is not None:
+        texture_cache.update(atlas)
     
-    # Load tile textures based on JSON data
-    for tile_id, tile_info in tile_data.items():
-        texture_file = tile_info.get("texture")
-        tile_name = tile_info.get("name")
-        
-        if texture_file and tile_name:
-            texture_path = f"./textures/tiles/{texture_file}"
-            textures[tile_name] = get_texture(texture_path)
-            
-            # Add to numeric lookup as well (as integers)
-            try:
-                int_id = int(tile_id)
-                textures[int_id] = textures[tile_name]
-            except ValueError:
-                print(f"Invalid tile ID (not an integer): {tile_id}")
-    
-    # Create tile mapping dictionary for easy lookup
+    # Tile textures by name and by id; ids without a texture draw the fallback
     tile_mapping = {}
-    for tile_id, tile_info in tile_data.items():
-        try:
-            int_id = int(tile_id)
-            tile_name = tile_info.get("name")
-            if tile_name in textures:
-                tile_mapping[int_id] = textures[tile_name]
-        except ValueError:
-            continue
-    
-    # Player textures
-    textures['player_default'] = get_texture("./textures/player/default.png", TILE_SIZE, True)
-    textures['player_up'] = get_texture("./textures/player/up.png", TILE_SIZE, True)
-    textures['player_down'] = get_texture("./textures/player/down.png", TILE_SIZE, True)
-    textures['player_right'] = get_texture("./textures/player/right.png", TILE_SIZE, True)
-    textures['player_left'] = get_texture("./textures/player/left.png", TILE_SIZE, True)
-    textures['player_jump'] = get_texture("./textures/player/default.png", 128, True)
+    for tile_id in registry.ids:
+        texture_file = registry.textures[tile_id]
+        if texture_file:
+            texture = get_texture(tile_texture_path(texture_file))
+            textures[registry.names[tile_id]] = texture
+            textures[tile_id] = texture
+            tile_mapping[tile_id] = texture
     
-    # NPC textures
-    textures['npc'] = get_texture("./textures/player/npc.png", 16, True)
-    textures['npc_left'] = get_texture("./textures/player/npc_left.png", 16, True)
-    textures['npc_right'] = get_texture("./textures/player/npc_right.png", 16, True)
-    
-    # Store the complete tile mapping with fallback for missing textures
-    for i in range(50):  # Support up to 50 tile IDs
-        if i not in tile_mapping:
-            tile_mapping[i] = fallback_texture
+    # Player and NPC textures
+    for key, (path, size, use_alpha) in SPRITES.items():
+        textures[key] = get_texture(path, size, use_alpha)
+
+    # Their walk and jump frames, scaled once here rather than while drawing
+    textures['frames'] = build_frame_tables(textures)
     
     textures['tile_mapping'] = tile_mapping
+    pixel_cache.flush()
     
-    # Store collision information
-    collision_map = {}
-    for tile_id, tile_info in tile_data.items():
-        try:
-            int_id = int(tile_id)
-            collision_map[int_id] = tile_info.get("collidable", False)
-        except ValueError:
-            continue
-    
-    textures['collision_map'] = collision_map
-    
-    return textures
\ No newline at end of file
+    return textures